@@ -59,12 +59,8 @@ EOD REPORTING FLOW
 Timeline of EOD Greeks Capture:
 
 15:55:00 - Phase 2 portfolio rebalancing executes
-15:56:00 - OnData processes chain (fill refresh after Phase 2)
-         - Greeks cached with 15:56 timestamp
-         - Greeks are now 0 bars old
-
-15:57:00-15:58:00 - No chain processing (throttled)
-         - Greeks age to 1-2 bars old
+15:56:00-15:58:00 - No chain processing (OnData only stores the chain)
+         - Greeks from the 15:55 pass age to 1-3 bars old
          
 15:59:00 - OnData processes chain (EOD EXCEPTION)
          - update_chain() BYPASSES 15-minute throttling
@@ -562,7 +558,7 @@ class Analytics:
                     candidate = intent.candidate
                     symbol = candidate.get('symbol')
                     target_qty = candidate.get('target_contracts', 0)
-                    cached_delta = candidate.get('delta', 0.0)
+                    cached_delta = candidate.get('delta') or 0.0
                     
                     # CRITICAL FIX: Check if this trade is already filled in QC Portfolio
                     # If it's filled, don't count it as pending to avoid double-counting
@@ -588,6 +584,7 @@ class Analytics:
             
             # Removed redundant portfolio delta logging (already shown in P2A)
 
+            is_nav_band = getattr(self.algorithm, 'delta_band_is_nav', False)
             for und_sym, group in groups.items():
                 if group['kind'] != 'equity':  # Skip non-equity for now
                     continue
@@ -595,10 +592,9 @@ class Analytics:
                 current_notional = group['notional']
                 current_units = group['units']
 
-                mode = getattr(self.algorithm, 'delta_band_mode', 'TRADE').upper()
                 current_dollar_delta = group['dollar_delta']
 
-                if mode == 'NAV':
+                if is_nav_band:
                     # NAV mode: bands as percentages of portfolio MTM
                     nav = float(self.algorithm.Portfolio.TotalPortfolioValue)
                     target_notional = nav * float(getattr(self.algorithm, 'delta_target_nav_pct_equity', 0.05))
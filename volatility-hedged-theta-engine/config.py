@@ -82,8 +82,18 @@ POSITION_CLEANUP_DAYS = 7            # Clean up zero-quantity positions older th
 CHAIN_SNAPSHOT_MAX_ENTRIES = 100     # Hard cap for chain snapshot cache (per day)
 GREEKS_CACHE_MAX_ENTRIES = 200       # Hard cap for greeks_cache entries
 GREEKS_SNAPSHOT_INTERVAL_MINUTES = 15  # Interval for Greeks snapshot updates (15 minutes)
+MEMORY_PRESSURE_EVICTION_ENABLED = True   # Shrink Greeks/chain caches when process RSS is high
+MEMORY_PRESSURE_CHECK_MINUTES = 5         # How often to sample process RSS
+MEMORY_HIGH_WATER_BYTES = 1536 * 1024 * 1024  # Above 1.5 GB RSS: halve cache caps and evict LRU entries
+MEMORY_LOW_WATER_BYTES = 1024 * 1024 * 1024   # Below 1.0 GB RSS: restore caps to the hard limits above
+CACHE_MIN_ENTRIES_UNDER_PRESSURE = 25     # Floor for shrunk cache caps (keeps active positions cached)
+DELTA_VECTORIZE_MIN_LEGS = 16        # Reduce option-leg deltas with NumPy once the book has this many legs
+DELTA_JIT_MIN_LEGS = 512             # Use the Numba-compiled delta reduction and reduction scoring (when numba is installed) above this many legs
+MANUAL_GC_ENABLED = True             # Disable automatic GC; collect after phases and after the close instead
 DEBUG_LOGGING_ENABLED = False         # Enable/disable debug logging for performance
+VERBOSE_FILL_LOGS = True             # Log a POSITION FILLED line for every tracked fill
 MEMORY_MONITORING_ENABLED = False    # Enable memory usage monitoring
+PROFILE_HEDGING = False              # cProfile the P2 option reduction and log its top 10 cumulative functions
 
 # =============================================================================
 # DELTA HEDGING PARAMETERS
@@ -124,6 +134,8 @@ EXPIRY_COOLDOWN_DAYS = 2            # Cooldown period before adding to same expi
 # Hedging Throttling and Market Protection
 HEDGE_COOLDOWN_SECONDS = 900        # 15 minutes between hedges (reduced churn, Phase 2 only)
 HEDGE_CLOSE_PROXIMITY_SECONDS = 60  # Don't hedge within N seconds of market close
+MIN_REBALANCE_INTERVAL_SECONDS = 30 # Skip a repeat P2 rebalance within N seconds of the last one...
+REBALANCE_DELTA_EPSILON = 1000.0    # ...unless some underlying's dollar delta moved by at least this much
 
 # =============================================================================
 # BLACK-SCHOLES PARAMETERS
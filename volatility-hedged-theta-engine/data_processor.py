@@ -22,8 +22,8 @@ WITHOUT SELECTIVE PROCESSING:
 - Result: Multi-year backtests take DAYS to complete
 
 WITH SELECTIVE PROCESSING (THIS IMPLEMENTATION):
-- ~29 chain updates per day (93% reduction)
-- Only during execution phases + fill refreshes + EOD
+- 5 chain updates per day (~99% reduction)
+- Only at the scheduled execution bars (phases + EOD)
 - Result: Multi-year backtests complete in HOURS
 
 =============================================================================
@@ -33,19 +33,16 @@ EXECUTION PHASE TIMING
 Option chains are processed during THREE execution phases + exceptions:
 
 1. PHASE 0 (15:45): Exits and profit-taking
-   - OnData at 15:45 processes chain
-   - OnData at 15:46 refreshes fill data
+   - Scheduled event at 15:45 processes chain
    
 2. PHASE 1 (15:50): New option trades + per-trade hedging
-   - OnData at 15:50 processes chain
-   - OnData at 15:51 refreshes fill data
+   - Scheduled event at 15:50 processes chain
    
 3. PHASE 2 (15:55): Portfolio rebalancing
-   - OnData at 15:55 processes chain
-   - OnData at 15:56 refreshes fill data
+   - Scheduled event at 15:55 processes chain
 
 4. EOD EXCEPTION (15:59): Fresh Greeks for EOD reporting
-   - OnData at 15:59 ALWAYS processes chain (bypasses throttling)
+   - Scheduled event at 15:59 ALWAYS processes chain (bypasses throttling)
    - Ensures fresh data for 16:00 EOD logging
    - Critical: Prevents using stale 4-bar-old data
 
@@ -55,48 +52,46 @@ Option chains are processed during THREE execution phases + exceptions:
 
 TOTAL DAILY CHAIN PROCESSING:
 - Execution phases: 3 times (15:45, 15:50, 15:55)
-- Fill refreshes: 3 times (15:46, 15:51, 15:56)
 - EOD exception: 1 time (15:59)
-- Intra-day: ~20 times (every 15 minutes via throttling)
-- TOTAL: ~29 updates per day vs 390 without optimization
+- EOD reporting: 1 time (16:00)
+- Intra-day: none (no scheduled bars before 15:45; OnData only stores the chain)
+- TOTAL: 5 updates per day vs 390 without optimization
+  (config phase times outside these bars add one scheduled bar each)
 
 =============================================================================
 CHAIN PROCESSING FLOW
 =============================================================================
 
-Step 1: Timing Check (is_execution_time)
-   - Check if current time matches execution phases (15:45, 15:50, 15:55, 15:59)
-   - Check if current time matches EOD reporting (16:00)
-   
-Step 2: Fill Data Refresh Check (is_fill_data_time)
-   - Check if current time is ONE BAR AFTER execution phases
-   - Example: 15:46 is fill refresh for 15:45 phase
-   - Ensures fresh data available for force-filled orders
-   
-Step 3: Combined Decision (should_process_chains)
-   - Process if: is_execution_time OR is_fill_data_time
-   - Skip if: Neither condition met (saves 93% of processing)
-   
-Step 4: Chain Update (if processing)
-   - Store chain in algorithm.current_chain
+Timing is handled by QC scheduled events (registered by
+DataProcessor.schedule_chain_processing from main.Initialize), not by OnData.
+OnData only stores a reference to the latest chain - no time arithmetic per bar.
+
+Step 1: OnData (every bar)
+   - algorithm.current_chain = slice chain for the subscribed option (keyed lookup)
+
+Step 2: Execution bars (scheduled at 15:45, 15:50, 15:55, 15:59, 16:00)
+   - process_execution_chain() runs BEFORE ExecuteStrategy at the same time
+   - Build algorithm.current_chain_soa (NumPy arrays) for vectorized filtering
    - Call options_data.update_chain() → applies 15-min throttling
    - Call options_data.seed_active_positions() → cache active positions
    - Log processing reason for debugging
 
+Fills need no chain processing: the fill model prices from Securities quotes,
+which QC updates every bar.
+
 =============================================================================
 THROTTLING INTERACTION
 =============================================================================
 
-This module controls WHEN to process chains (timing gates).
+This module controls WHEN to process chains (scheduled events).
 OptionsDataManager controls HOW OFTEN to update snapshots (throttling).
 
-TIMING GATES (DataProcessor):
-- OnData called at 15:43 → SKIP (not execution phase)
-- OnData called at 15:45 → PROCESS (Phase 0)
-- OnData called at 15:46 → PROCESS (Fill refresh)
-- OnData called at 15:47 → SKIP (not execution phase)
-- OnData called at 15:59 → PROCESS (EOD exception)
-- OnData called at 16:00 → PROCESS (EOD reporting)
+SCHEDULED PROCESSING (DataProcessor):
+- 15:43 → OnData stores chain reference only
+- 15:45 → PROCESS (Phase 0)
+- 15:46 → OnData stores chain reference only
+- 15:59 → PROCESS (EOD exception)
+- 16:00 → PROCESS (EOD reporting)
 
 SNAPSHOT THROTTLING (OptionsDataManager):
 - update_chain() called at 15:45 → May skip if updated <15 min ago
@@ -104,7 +99,7 @@ SNAPSHOT THROTTLING (OptionsDataManager):
 - update_chain() called at 16:00 → ALWAYS updates (EOD bypass)
 
 COMBINED EFFECT:
-- Timing gates reduce OnData calls from 390/day to ~29/day
+- Scheduled events reduce chain processing from 390/day to 5/day
 - Throttling further reduces snapshot updates within those calls
 - EOD exception ensures critical reporting always has fresh data
 
@@ -112,8 +107,9 @@ COMBINED EFFECT:
 INTRADAY RISK MONITORING INTEGRATION
 =============================================================================
 
-Risk monitoring is scheduled every 5 minutes but DISABLED during execution 
-phases to prevent conflicts:
+Risk monitoring is driven by a QC scheduled event (main.Initialize) every 5
+minutes, NOT by OnData, and is DISABLED during execution phases to prevent
+conflicts:
 
 RISK MONITORING WINDOWS:
 - Active: 09:30 - 15:39 (check every 5 minutes)
@@ -133,14 +129,11 @@ Log Messages Explained:
 "OPTION CHAIN PROCESSING: Execution phase at HH:MM:SS"
 → Chain processed during scheduled execution phase (15:45/15:50/15:55/15:59/16:00)
 
-"OPTION CHAIN PROCESSING: Fill data refresh at HH:MM:SS (after HH:MM)"
-→ Chain processed one bar after execution phase for fill data
-
 "Chain cached: N contracts"
 → Snapshot captured N option contracts (only logged on significant changes)
 
-"OnData processing error: ..."
-→ Exception during chain processing (investigate immediately)
+"Chain processing error: ..."
+→ Exception during scheduled chain processing (investigate immediately)
 
 =============================================================================
 PERFORMANCE METRICS
@@ -154,9 +147,9 @@ Before Optimization (No Throttling):
 
 After Optimization (This Implementation):
 - OnData calls: 390 per day (QC controls this)
-- Chain processing: ~29 per day (93% reduction)
-- Annual overhead: ~7,308 updates/year (93% reduction)
-- 5-year backtest: ~36,540 updates (HOURS to complete)
+- Chain processing: 5 per day (~99% reduction)
+- Annual overhead: ~1,260 updates/year (~99% reduction)
+- 5-year backtest: ~6,300 updates (HOURS to complete)
 
 Memory Savings:
 - Greeks cache: 200 entries (down from 2000, 90% reduction)
@@ -167,23 +160,64 @@ Memory Savings:
 """
 
 from AlgorithmImports import *
+from operator import attrgetter
+from types import SimpleNamespace
+import numpy as np
+from config import PHASE_0_TIME, PHASE_1_TIME, PHASE_2_TIME
+
+# Fixed execution bars (hour, minute): phases + EOD prep (15:59) + EOD reporting (16:00)
+_EXECUTION_TIMES = frozenset({(15, 45), (15, 50), (15, 55), (15, 59), (16, 0)})
+
+
+def _parse_phase_times(phase_time_strs):
+    """Parse "HH:MM" phase strings into (hour, minute) int tuples, skipping invalid entries."""
+    parsed = []
+    for phase_time_str in phase_time_strs:
+        try:
+            phase_hour, phase_minute = map(int, phase_time_str.split(':'))
+        except Exception:
+            continue
+        if 0 <= phase_hour * 60 + phase_minute < 24 * 60 - 1:
+            parsed.append((phase_hour, phase_minute))
+    return tuple(parsed)
+
+
+# Phase timing parsed once at import: (hour, minute) per config phase
+_PHASE_HM = _parse_phase_times((PHASE_0_TIME, PHASE_1_TIME, PHASE_2_TIME))
+# Full chain processing bars: fixed execution bars + config phases
+_SCHEDULED_EXECUTION_TIMES = _EXECUTION_TIMES | frozenset(_PHASE_HM)
+# Contract fields read by _build_chain_soa, fetched in one C-level call per contract
+_CONTRACT_FIELDS = attrgetter('BidPrice', 'AskPrice', 'Expiry', 'Right')
 
 
 class DataProcessor:
     """
     Handles OnData processing with selective option chain updates.
     
-    Implements timing gates to process chains only during execution phases,
-    fill refreshes, and EOD exceptions. Works in conjunction with 
-    OptionsDataManager's throttling for optimal performance.
+    OnData only stores the latest chain; chain processing runs from scheduled
+    events at execution phases and EOD exceptions. Works in
+    conjunction with OptionsDataManager's throttling for optimal performance.
     """
     
     def __init__(self, algorithm):
         self.algorithm = algorithm
+        self._execution_times = _SCHEDULED_EXECUTION_TIMES
+
+    def schedule_chain_processing(self):
+        """
+        Register chain processing on QC's scheduler.
+        
+        Call from Initialize BEFORE the ExecuteStrategy schedules so that, at a shared
+        time, the chain is processed before the phase runs.
+        """
+        algo = self.algorithm
+        date_rule = algo.DateRules.EveryDay(algo.underlying_symbol)
+        for hour, minute in sorted(self._execution_times):
+            algo.Schedule.On(date_rule, algo.TimeRules.At(hour, minute), self.process_execution_chain)
     
     def process_data(self, data):
         """
-        Main data handler - optimized to only process option chains during execution phases.
+        Main data handler - stores the latest option chain for the subscribed option.
         
         CRITICAL: This OnData chain data is MANDATORY for:
         - All trading execution (order placement, fills)
@@ -191,93 +225,80 @@ class DataProcessor:
         - All position management (real-time pricing)
         
         This data is NOT used for option filtering (which uses hybrid approach).
+        Processing happens in the scheduled process_execution_chain.
+        """
+        option_chains = data.OptionChains
+        # Single bridge read of the C# Count property (O(1)) instead of Python truthiness
+        if option_chains is None or option_chains.Count == 0:
+            return
+        # Direct keyed lookup (O(1)) instead of scanning every chain in the slice
+        option_symbol = self.algorithm.option.Symbol
+        if option_chains.ContainsKey(option_symbol):
+            self.algorithm.current_chain = option_chains[option_symbol]
+
+    def process_execution_chain(self):
+        """
+        Scheduled at execution bars (15:45, 15:50, 15:55, 15:59, 16:00 + config phases): full chain processing.
         """
+        # Bind hot-path attributes once per call
+        algo = self.algorithm
+        debug = algo.debug_mode
         try:
-            # Intraday risk monitoring (every 5 minutes during market hours)
-            # Skip during execution phases (15:40-16:00) to avoid conflicts with P2 hedging
-            current_time = self.algorithm.Time.time()
-            is_execution_phase = (current_time.hour == 15 and current_time.minute >= 40) or \
-                                (current_time.hour == 16 and current_time.minute == 0)
-            
-            if hasattr(self.algorithm, 'intraday_risk_monitor') and self.algorithm.intraday_risk_monitor and not is_execution_phase:
-                self.algorithm.intraday_risk_monitor.check_risk()
-            
-            # Process option chains during specific execution phases AND the next bar after
-            # This ensures fresh data is available for force-filled orders
-            # Execution phases: 15:45, 15:50, 15:55, 15:59 (for fresh EOD Greeks), 16:00 (from config)
-            # Next bars: 15:46, 15:51, 15:56 (for fresh fill data)
-            is_execution_time = (
-                (current_time.hour == 15 and current_time.minute in [45, 50, 55, 59]) or  # Specific execution phases + EOD prep
-                (current_time.hour == 16 and current_time.minute == 0)               # EOD reporting
-            )
-            
-            # Dynamic fill data refresh based on config phases
-            # Create 2-bar windows: [execution_phase, execution_phase + 1 minute]
-            from config import PHASE_0_TIME, PHASE_1_TIME, PHASE_2_TIME
-            phase_times = [PHASE_0_TIME, PHASE_1_TIME, PHASE_2_TIME]
-            is_fill_data_time = False
+            chain = algo.current_chain
+            if chain is None:
+                return
+
+            # Structure-of-arrays view of the chain for vectorized downstream filtering
+            algo.current_chain_soa = chain_soa = self._build_chain_soa(chain)
+            # Contract count captured once here (the SoA already materialized the contracts)
+            current_count = len(chain_soa.contracts)
+
+            # Log the processing reason for debugging
+            if debug:
+                algo.Debug(f"OPTION CHAIN PROCESSING: Execution phase at {algo.Time.strftime('%H:%M:%S')}")
             
-            for phase_time_str in phase_times:
-                try:
-                    # Parse phase time (e.g., "15:45" -> hour=15, minute=45)
-                    phase_hour, phase_minute = map(int, phase_time_str.split(':'))
-                    
-                    # Check if current time is the execution phase OR the next minute
-                    if (current_time.hour == phase_hour and 
-                        current_time.minute in [phase_minute, phase_minute + 1]):
-                        is_fill_data_time = True
-                        break
-                except Exception:
-                    # Skip invalid phase times
-                    continue
-            
-            # Process option chains during execution phases OR fill data times
-            should_process_chains = is_execution_time or is_fill_data_time
-            
-            if not should_process_chains:
-                return  # Skip processing outside execution windows and fill data times
-            
-            # Store latest option chain for scheduled execution
-            if data.OptionChains:
-                for kvp in data.OptionChains:
-                    if kvp.Key == self.algorithm.option.Symbol:
-                        self.algorithm.current_chain = kvp.Value
-                        
-                        # Log the processing reason for debugging
-                        if self.algorithm.debug_mode:
-                            if is_execution_time:
-                                self.algorithm.Debug(f"OPTION CHAIN PROCESSING: Execution phase at {current_time.strftime('%H:%M:%S')}")
-                            elif is_fill_data_time:
-                                # Find which phase triggered the fill data refresh
-                                triggered_phase = None
-                                for phase_time_str in phase_times:
-                                    try:
-                                        phase_hour, phase_minute = map(int, phase_time_str.split(':'))
-                                        if (current_time.hour == phase_hour and 
-                                            current_time.minute == phase_minute + 1):
-                                            triggered_phase = phase_time_str
-                                            break
-                                    except Exception:
-                                        continue
-                                
-                                phase_info = f" (after {triggered_phase})" if triggered_phase else ""
-                                self.algorithm.Debug(f"OPTION CHAIN PROCESSING: Fill data refresh at {current_time.strftime('%H:%M:%S')}{phase_info}")
-                        
-                        # Centralized QC Greeks handling
-                        try:
-                            self.algorithm.options_data.update_chain(self.algorithm.current_chain)
-                            self.algorithm.options_data.seed_active_positions()
-                        except Exception:
-                            if self.algorithm.debug_mode:
-                                self.algorithm.Debug("OptionsDataManager update error")
-                        break
-            # Optional debug - only log when chain size changes significantly
-            if self.algorithm.debug_mode and hasattr(self.algorithm, 'current_chain'):
-                current_count = len(self.algorithm.current_chain)
-                if not hasattr(self.algorithm, '_last_chain_count') or abs(current_count - self.algorithm._last_chain_count) > 5:
-                    self.algorithm.Debug(f"Chain cached: {current_count} contracts")
-                self.algorithm._last_chain_count = current_count
+            # Centralized QC Greeks handling (errors surface via the single outer handler)
+            options_data = algo.options_data
+            options_data.update_chain(chain)
+            options_data.seed_active_positions()
+
+            # Optional debug - only log when a new chain changes size significantly
+            if debug:
+                if abs(current_count - algo._last_chain_count) > 5:
+                    algo.Debug(f"Chain cached: {current_count} contracts")
+                algo._last_chain_count = current_count
                 
         except Exception as e:
-            if self.algorithm.debug_mode:
-                self.algorithm.Debug(f"OnData processing error: {e}")
+            if debug:
+                algo.Debug(f"Chain processing error: {e}")
+
+    def _build_chain_soa(self, chain):
+        """
+        Extract chain contract fields into contiguous NumPy arrays (structure-of-arrays).
+
+        Only the fields the candidate prefilter uses (quotes, expiry, right) are read across
+        the C#/Python bridge, once per contract, so downstream scans can use vector masks.
+        Greeks/IV are not touched here (each read triggers a pricing-model evaluation).
+        Arrays are aligned with `contracts` (same index = same contract).
+        """
+        contracts = list(chain)
+        n = len(contracts)
+        bids = np.empty(n, dtype=np.float64)
+        asks = np.empty(n, dtype=np.float64)
+        expiry_ord = np.empty(n, dtype=np.int64)
+        is_put = np.empty(n, dtype=np.bool_)
+
+        put = OptionRight.Put
+        for i, c in enumerate(contracts):
+            bids[i], asks[i], expiry, right = _CONTRACT_FIELDS(c)
+            expiry_ord[i] = expiry.date().toordinal() if hasattr(expiry, 'date') else expiry.toordinal()
+            is_put[i] = right == put
+
+        return SimpleNamespace(
+            chain=chain,
+            contracts=contracts,
+            bids=bids,
+            asks=asks,
+            expiry_ord=expiry_ord,
+            is_put=is_put,
+        )
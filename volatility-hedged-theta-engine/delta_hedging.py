@@ -6,7 +6,124 @@ Supports NAV-based and points-based sizing modes.
 """
 
 from AlgorithmImports import *
-from collections import defaultdict
+import cProfile
+import io
+import pstats
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional
+import numpy as np
+
+from config import DELTA_VECTORIZE_MIN_LEGS, DELTA_JIT_MIN_LEGS
+
+try:
+    from numba import njit  # Optional: not available on every LEAN image
+except ImportError:
+    njit = None
+
+
+@dataclass(slots=True)
+class _ReductionCandidate:
+    """Option position considered by the P2 option reduction, with its scoring inputs and factors"""
+    pos_id: str
+    symbol: Any
+    quantity: float
+    strike: float
+    expiration: Any
+    entry_price: float
+    estimated_margin: float
+    delta: float = 0.0
+    current_price: float = 0.0
+    dte: Optional[int] = None
+    delta_efficiency: float = 0.0
+    size_factor: float = 0.0
+    dte_factor: float = 0.0
+    pnl_factor: float = 0.0
+    reduction_score: float = 0.0
+
+
+class FilledOptionPosition(NamedTuple):
+    """Invested option holding as read from the QC Portfolio"""
+    symbol: Any
+    quantity: float
+    strike: float
+    expiration: Any
+    entry_price: float
+
+
+if njit is not None:
+    # Explicit signature: compiled eagerly at import (or loaded from numba's on-disk cache),
+    # so no hedge pass pays the first-call compile
+    @njit("UniTuple(float64[:], 3)(float64[:], float64[:], float64[:], float64[:], boolean[:], int64[:], int64)",
+          cache=True, fastmath=True)
+    def _reduce_leg_deltas(d, qty, price, mult, is_equity, und_idx, n_groups):
+        """Per-underlying sums of units, band notional and dollar delta for option legs."""
+        units_out = np.zeros(n_groups)
+        notional_out = np.zeros(n_groups)
+        dollar_out = np.zeros(n_groups)
+        for i in range(d.shape[0]):
+            g = und_idx[i]
+            if is_equity[i]:
+                u = d[i] * qty[i] * 100.0
+                notional_out[g] += abs(qty[i]) * 100.0 * price[i]
+            else:
+                u = d[i] * qty[i]
+                notional_out[g] += u * price[i] * mult[i]
+            units_out[g] += u
+            dollar_out[g] += u * price[i]
+        return units_out, notional_out, dollar_out
+
+    @njit("UniTuple(float64[:], 5)(float64[:], float64[:], float64[:], float64[:], float64[:], float64[:], "
+          "float64, float64, float64, float64)", cache=True, fastmath=True)
+    def _score_positions(qty, delta, margin, entry_price, current_price, dte, w_d, w_s, w_dte, w_pnl):
+        """Reduction factors (delta efficiency, size, DTE, P&L) and weighted score per candidate."""
+        n = qty.shape[0]
+        eff = np.zeros(n)
+        size_f = np.zeros(n)
+        dte_f = np.zeros(n)
+        pnl_f = np.zeros(n)
+        score = np.zeros(n)
+        for i in range(n):
+            if margin[i] > 0:
+                eff[i] = abs(delta[i] * qty[i] * 100.0) / margin[i]
+            size_f[i] = min(abs(qty[i]) / 50.0, 1.0)
+            if dte[i] < 30:
+                dte_f[i] = max(0.0, (30.0 - dte[i]) / 30.0)
+            if entry_price[i] > 0 and current_price[i] > 0:
+                pnl_f[i] = max(0.0, -(current_price[i] - entry_price[i]) / entry_price[i])
+            score[i] = eff[i] * w_d + size_f[i] * w_s + dte_f[i] * w_dte + pnl_f[i] * w_pnl
+        return eff, size_f, dte_f, pnl_f, score
+else:
+    _reduce_leg_deltas = None
+    _score_positions = None
+
+
+def _new_delta_group():
+    """Empty per-underlying accumulator as returned by compute_delta_groups."""
+    return {'units': 0.0, 'notional': 0.0, 'price': 0.0, 'mult': 1.0, 'kind': None,
+            'dollar_delta': 0.0, 'option_delta': 0.0, 'hedge_delta': 0.0, 'per_unit_dollar': 0.0}
+
+
+@lru_cache(maxsize=4096)
+def _margin_per_contract(strike_cents, option_price_cents, underlying_price_cents, estimated_margin_pct):
+    """Reg-T style margin per short put contract; prices are passed in cents so nearby inputs share entries."""
+    strike = strike_cents / 100.0
+    option_price = option_price_cents / 100.0
+    underlying_price = underlying_price_cents / 100.0
+    otm = max(0.0, underlying_price - strike)  # Out-of-the-money amount
+
+    # Two common Reg-T floors
+    estimate1 = 0.20 * underlying_price * 100 - otm * 100 + option_price * 100  # 20% underlying - OTM + premium
+    estimate2 = 0.10 * underlying_price * 100 + option_price * 100              # 10% underlying + premium
+    pct_floor = estimated_margin_pct * strike * 100  # Config percentage floor
+
+    return max(500, estimate1, estimate2, pct_floor)  # Small hard floor of 500
+
+
+def _iround(x):
+    """Round half away from zero to int (hedge sizes don't need banker's rounding)."""
+    return int(x + 0.5) if x >= 0 else -int(-x + 0.5)
 
 
 class DeltaHedger:
@@ -14,43 +131,133 @@ class DeltaHedger:
 
     def __init__(self, algorithm):
         self.algorithm = algorithm
+        # Asset kind and contract multiplier never change for a symbol; memoize per underlying
+        self._kind_cache = {}
+        self._mult_cache = {}
+        # Symbol -> contract index of current_chain, rebuilt only when the chain object changes
+        self._chain_index_source = None
+        self._chain_index = {}
+        # Per-time-step caches, all dropped when algorithm time advances:
+        # net open-order quantity per symbol (also dropped for a symbol on any order event),
+        # underlying (price, mult, kind), option -> underlying, and market-open flag per symbol
+        self._open_qty_cache = {}
+        self._und_info_cache = {}
+        self._opt_to_und_cache = {}
+        self._market_open_cache = {}
+        self._cycle_time = None
+        # Last universal rebalance pass that got past the min-interval gate, with its
+        # dollar delta per underlying (equity and futures groups are compared separately)
+        self._last_rebalance_time = None
+        self._last_group_deltas = {}
+
+    def _refresh_cycle_caches(self):
+        now = self.algorithm.Time
+        if now != self._cycle_time:
+            self._open_qty_cache.clear()
+            self._und_info_cache.clear()
+            self._opt_to_und_cache.clear()
+            self._market_open_cache.clear()
+            self._cycle_time = now
+
+    def _get_und_info(self, und_sym):
+        """(price, mult, kind) for a subscribed underlying, read once per time step"""
+        self._refresh_cycle_caches()
+        info = self._und_info_cache.get(und_sym)
+        if info is None:
+            kind = self._asset_kind(und_sym)
+            mult = self._fut_multiplier(und_sym) if kind == 'future' else 1.0
+            info = self._und_info_cache[und_sym] = (float(self.algorithm.Securities[und_sym].Price), mult, kind)
+        return info
+
+    def _get_open_net_qty(self, sym):
+        """Net quantity of open orders on sym (cached for the current time step)"""
+        self._refresh_cycle_caches()
+        open_qty = self._open_qty_cache.get(sym)
+        if open_qty is None:
+            open_qty = self._open_qty_cache[sym] = int(sum(order.Quantity for order in self.algorithm.Transactions.GetOpenOrders(sym)))
+        return open_qty
+
+    def _is_market_open(self, sym):
+        """IsMarketOpen for sym, asked once per time step (treated as open if the check fails)"""
+        self._refresh_cycle_caches()
+        is_open = self._market_open_cache.get(sym)
+        if is_open is None:
+            try:
+                is_open = bool(self.algorithm.IsMarketOpen(sym))
+            except Exception:
+                is_open = True
+            self._market_open_cache[sym] = is_open
+        return is_open
+
+    def invalidate_open_qty(self, sym):
+        """Forget the cached open-order quantity for sym (any order event on it may change it)"""
+        self._open_qty_cache.pop(sym, None)
+
+    def clear_symbol_cache(self, sym):
+        """Drop memoized kind/multiplier for a symbol (called when it leaves the universe)"""
+        self._kind_cache.pop(sym, None)
+        self._mult_cache.pop(sym, None)
 
     def _get_underlying_symbol(self, opt_symbol):
         """Get underlying symbol for an option (works for equity and futures options)"""
-        try:
-            return opt_symbol.Underlying
-        except:
+        underlying = self._opt_to_und_cache.get(opt_symbol)
+        if underlying is None:
+            self._refresh_cycle_caches()
+            underlying = getattr(opt_symbol, 'Underlying', None)
             # Fallback: use known underlying if mapping not available
-            return self.algorithm.underlying_symbol
+            if underlying is None:
+                underlying = self.algorithm.underlying_symbol
+            self._opt_to_und_cache[opt_symbol] = underlying
+        return underlying
 
     def _fut_multiplier(self, und_sym):
         """Get futures multiplier ($ per 1 point move for a single futures contract)"""
-        try:
-            return self.algorithm.Securities[und_sym].SymbolProperties.ContractMultiplier or 1.0
-        except:
-            return 1.0
+        mult = self._mult_cache.get(und_sym)
+        if mult is None:
+            if und_sym not in self.algorithm.Securities:
+                # Not cached: the security may simply not be subscribed yet
+                return 1.0
+            props = getattr(self.algorithm.Securities[und_sym], 'SymbolProperties', None)
+            mult = self._mult_cache[und_sym] = getattr(props, 'ContractMultiplier', None) or 1.0
+        return mult
 
     def _asset_kind(self, und_sym):
         """Determine if underlying is equity or future"""
-        try:
-            st = und_sym.SecurityType
-        except:
-            try:
+        kind = self._kind_cache.get(und_sym)
+        if kind is None:
+            st = getattr(und_sym, 'SecurityType', None)
+            if st is None:
+                if und_sym not in self.algorithm.Securities:
+                    return "equity"  # Default assumption
                 st = self.algorithm.Securities[und_sym].Symbol.SecurityType
-            except:
-                return "equity"  # Default assumption
-        return "equity" if st == SecurityType.Equity else "future"
-
-    def get_all_filled_option_positions(self):
+            kind = self._kind_cache[und_sym] = "equity" if st == SecurityType.Equity else "future"
+        return kind
+
+    def _chain_contracts_by_symbol(self):
+        """Symbol -> OptionContract for the current chain (empty if no chain)"""
+        chain = self.algorithm.current_chain
+        if chain is None:
+            return {}
+        if chain is not self._chain_index_source:
+            self._chain_index = {contract.Symbol: contract for contract in chain}
+            self._chain_index_source = chain
+        return self._chain_index
+
+    def get_all_filled_option_positions(self, invested_out: set = None):
         """
         Get all filled option positions from QC Portfolio.
         This is the source of truth for what's actually in the portfolio.
-        Returns list of (symbol, quantity, strike, expiration) tuples.
+        Returns list of FilledOptionPosition tuples.
+        If invested_out is given, invested non-option symbols seen during the
+        same Portfolio pass are added to it.
         """
         filled_positions = []
+        chain_contracts = None  # Built on the first invested option
         
         # Query QC Portfolio for all option positions
         for symbol, holding in self.algorithm.Portfolio.items():
+            if invested_out is not None and holding.Invested and symbol.SecurityType != SecurityType.Option:
+                invested_out.add(symbol)
             if (symbol.SecurityType == SecurityType.Option and 
                 holding.Invested and 
                 abs(holding.Quantity) > 0):
@@ -60,278 +267,179 @@ class DeltaHedger:
                 expiration = None
                 
                 # First try to get from current option chain
-                if hasattr(self.algorithm, 'current_chain') and self.algorithm.current_chain:
-                    for contract in self.algorithm.current_chain:
-                        if contract.Symbol == symbol:
-                            strike = contract.Strike
-                            expiration = contract.Expiry
-                            break
+                if chain_contracts is None:
+                    chain_contracts = self._chain_contracts_by_symbol()
+                contract = chain_contracts.get(symbol)
+                if contract is not None:
+                    strike = contract.Strike
+                    expiration = contract.Expiry
                 
                 # If not found in current chain, try to get from symbol ID
                 if strike is None or expiration is None:
-                    try:
-                        # Try different ways to access option contract info
-                        if hasattr(symbol, 'ID') and hasattr(symbol.ID, 'OptionContract'):
-                            option_contract = symbol.ID.OptionContract
-                            strike = option_contract.Strike
-                            expiration = option_contract.Expiry
-                        elif hasattr(symbol, 'ID') and hasattr(symbol.ID, 'OptionRight'):
-                            # For now, use fallback values if we can't get exact details
-                            # This is a limitation - we need the contract details for proper delta calculation
-                            strike = 0.0  # Will be updated when we find the contract
-                            expiration = None
-                    except Exception as e:
-                        if self.algorithm.debug_mode:
-                            self.algorithm.Debug(f"Could not get option contract details for {symbol}: {e}")
-                        continue
+                    # Attribute probes via getattr sentinels; no exception raised on the normal path
+                    symbol_id = getattr(symbol, 'ID', None)
+                    option_contract = getattr(symbol_id, 'OptionContract', None)
+                    if option_contract is not None:
+                        strike = getattr(option_contract, 'Strike', None)
+                        expiration = getattr(option_contract, 'Expiry', None)
+                    elif getattr(symbol_id, 'OptionRight', None) is not None:
+                        # For now, use fallback values if we can't get exact details
+                        # This is a limitation - we need the contract details for proper delta calculation
+                        strike = 0.0  # Will be updated when we find the contract
+                        expiration = None
+                    if (strike is None or expiration is None) and self.algorithm.debug_mode:
+                        self.algorithm.Debug(f"Could not get option contract details for {symbol}")
                 
                 # Only add if we have valid contract details
                 if strike is not None and expiration is not None:
-                    filled_positions.append({
-                        'symbol': symbol,
-                        'quantity': holding.Quantity,
-                        'strike': strike,
-                        'expiration': expiration,
-                        'entry_price': holding.AveragePrice
-                    })
+                    filled_positions.append(FilledOptionPosition(
+                        symbol, holding.Quantity, strike, expiration, holding.AveragePrice))
         
         return filled_positions
 
-    def compute_delta_groups(self, pending: list = None):
+    def _active_option_positions(self):
+        """(underlying, position) pairs for ledger option positions with non-zero quantity"""
+        # positions_by_underlying already groups non-hedge positions, so no per-position underlying lookup
+        return [(und_sym, pos)
+                for und_sym, bucket in self.algorithm.positions_by_underlying.items()
+                for pos in bucket.values() if pos.get('quantity', 0) != 0]
+
+    def compute_delta_groups(self, pending: list = None, need_notional: bool = True,
+                             active_option_positions: list = None):
         """
         Aggregate delta by underlying for universal hedging.
+        Pass need_notional=False when only dollar delta is read; 'notional' is then left at 0.
+        active_option_positions may be passed in when the caller already built it
+        (see _active_option_positions).
         Returns groups[underlying] = {
             'units': units-equivalent delta (shares or contracts),
             'notional': delta-notional in USD,
             'price': underlying price,
             'mult': futures multiplier ($/pt) or 1 for equities,
-            'kind': 'equity' or 'future'
+            'kind': 'equity' or 'future',
+            'per_unit_dollar': dollar value of one hedge unit (price, or price * mult for futures)
         }
         """
-        groups = defaultdict(lambda: {'units': 0.0, 'notional': 0.0, 'price': 0.0, 'mult': 1.0, 'kind': None, 'dollar_delta': 0.0, 'option_delta': 0.0, 'hedge_delta': 0.0})
+        algo = self.algorithm
+        debug = algo.debug_mode
+        securities = algo.Securities
 
-        # PERFORMANCE OPTIMIZATION: Only process underlyings we actually hedge
-        # Build set of relevant underlyings from ACTIVE positions and known underlying
-        relevant_underlyings = set()
+        if debug:
+            assert algo.positions_hedge == {pos_id: pos for pos_id, pos in algo.positions.items()
+                                            if pos.get('is_hedge', False)}, "positions_hedge out of sync with positions"
 
-        # Always include the main underlying
-        relevant_underlyings.add(self.algorithm.underlying_symbol)
+        # Plain dict: groups are created explicitly on first contribution (no default-factory call per access)
+        groups = {}
+
+        # Python-side mirror of Securities keys; avoids a SecurityManager lookup per membership test
+        sec_symbols = algo.security_symbols()
+        portfolio = algo.Portfolio
 
         # CRITICAL FIX: Get ALL filled option positions from QC Portfolio (source of truth)
-        filled_option_positions = self.get_all_filled_option_positions()
-        if self.algorithm.debug_mode and filled_option_positions:
+        invested_underlyings = set()
+        filled_option_positions = self.get_all_filled_option_positions(invested_underlyings)
+        if debug and filled_option_positions:
             # Reduced logging - only show count, not individual positions
-            self.algorithm.Debug(f"DELTA GROUPS: Found {len(filled_option_positions)} filled option positions from QC Portfolio")
-            for pos in filled_option_positions:
-                opt_sym = pos['symbol']
-                und_sym = self._get_underlying_symbol(opt_sym)
-                
-                # Get current option price and Greeks
-                option_price = 0.0
-                delta_val = 0.0
-                gamma_val = 0.0
-                theta_val = 0.0
-                
-                if opt_sym in self.algorithm.Securities:
-                    opt_sec = self.algorithm.Securities[opt_sym]
-                    option_price = opt_sec.Price
-                    
-                    # Get Greeks via vol model abstraction
-                    if und_sym in self.algorithm.Securities:
-                        und_sec = self.algorithm.Securities[und_sym]
-                        underlying_price = und_sec.Price
-                        
-                        try:
-                            delta_val, _ = self.algorithm.greeks_provider.get_delta(opt_sym, pos['strike'], underlying_price, pos['expiration'])
-                            gamma_val, _ = self.algorithm.greeks_provider.get_gamma(opt_sym, pos['strike'], underlying_price, pos['expiration'])
-                            theta_val, _ = self.algorithm.greeks_provider.get_theta(opt_sym, pos['strike'], underlying_price, pos['expiration'])
-                        except Exception as e:
-                            # Reduced error logging
-                            pass
-                
-                # Individual position details removed to reduce logging
+            algo.Debug(f"DELTA GROUPS: Found {len(filled_option_positions)} filled option positions from QC Portfolio")
         
+        # PERFORMANCE OPTIMIZATION: Only process underlyings we actually hedge
+        # One pass resolves each option's underlying; the loops below read it from underlyings_by_opt
+        underlyings_by_opt = {}
         for position in filled_option_positions:
-            opt_sym = position['symbol']
-            und_sym = self._get_underlying_symbol(opt_sym)
-            relevant_underlyings.add(und_sym)
-
-        # Include underlyings from ACTIVE option positions in positions dictionary (for pending trades)
-        active_option_positions = [pos for pos_id, pos in self.algorithm.positions.items()
-                                   if pos.get('quantity', 0) != 0 and not pos.get('is_hedge', False)]
-        for position in active_option_positions:
-            if position.get('symbol'):  # Skip hedge positions
-                opt_sym = position['symbol']
-                und_sym = self._get_underlying_symbol(opt_sym)
-                relevant_underlyings.add(und_sym)
-
-        # Include underlyings from pending option trades
+            opt_sym = position.symbol
+            underlyings_by_opt[opt_sym] = self._get_underlying_symbol(opt_sym)
+
+        # Include underlyings from ACTIVE option positions (for pending trades)
+        if active_option_positions is None:
+            active_option_positions = self._active_option_positions()
+        for und_sym, pos in active_option_positions:
+            underlyings_by_opt.setdefault(pos['symbol'], und_sym)
+
+        # Membership sets for the double-counting checks below (replace per-item ledger scans)
+        filled_option_symbols = {pos.symbol for pos in filled_option_positions}
+        active_option_symbols = {pos['symbol'] for _, pos in active_option_positions}
+        hedge_underlyings = {pos.get('symbol') for pos_id, pos in algo.positions_hedge.items()
+                             if pos_id.startswith('hedge_')}
+
+        # Include underlyings from pending option trades (symbol, quantity, cached_delta)
         if pending:
-            for item in pending:
-                try:
-                    if len(item) >= 2:
-                        opt_symbol = item[0]
-                        und_sym = self._get_underlying_symbol(opt_symbol)
-                        relevant_underlyings.add(und_sym)
-                except Exception:
-                    pass
-
-        # Include underlying holdings (avoid double counting with positions dictionary)
-        for und_sym in relevant_underlyings:
-            if und_sym not in self.algorithm.Securities:
-                continue
-
-            # Only check portfolio if we actually have this symbol invested
-            if und_sym in self.algorithm.Portfolio and self.algorithm.Portfolio[und_sym].Invested:
-                sec = self.algorithm.Securities[und_sym]
-                kind = self._asset_kind(und_sym)
-                price = sec.Price
-                mult = self._fut_multiplier(und_sym) if kind == 'future' else 1.0
-                portfolio_qty = self.algorithm.Portfolio[und_sym].Quantity
-
-                # Check if this position is already tracked in our positions dictionary
-                # Look for hedge positions by position ID pattern, not exact quantity match
-                already_tracked = False
-                for pos_id, pos in self.algorithm.positions.items():
-                    if (pos.get('symbol') == und_sym and
-                        pos_id.startswith('hedge_') and  # This is a hedge position
-                        pos.get('is_hedge', False)):    # Confirm it's marked as hedge
-                        already_tracked = True
-                        # Skip existing hedge positions to avoid double-counting
-                        break
-
-                if not already_tracked:
-                    # Include Portfolio position in delta calculation
-                    groups[und_sym]['units'] += portfolio_qty
-                    groups[und_sym]['notional'] += portfolio_qty * (price if kind == 'equity' else price * mult)
-                    groups[und_sym]['price'] = price
-                    groups[und_sym]['mult'] = mult
-                    groups[und_sym]['kind'] = kind
-
-        # CRITICAL FIX: Add each FILLED option position's delta contribution from QC Portfolio
-        for position in filled_option_positions:
-            opt_sym = position['symbol']
-            if opt_sym not in self.algorithm.Securities:
-                continue
-
-            opt_sec = self.algorithm.Securities[opt_sym]
-            und_sym = self._get_underlying_symbol(opt_sym)
-            if und_sym not in self.algorithm.Securities:
-                continue
-
-            und_sec = self.algorithm.Securities[und_sym]
-            price = und_sec.Price
-            kind = self._asset_kind(und_sym)
-            mult = self._fut_multiplier(und_sym) if kind == 'future' else 1.0
-            qty = position['quantity']
-
-            # Get delta via vol model abstraction
-            d, delta_source = self.algorithm.greeks_provider.get_delta(opt_sym, position['strike'], price, position['expiration'])
-
-            # Units-equivalent per contract (QC delta is per contract):
-            # Equity options: 100 shares per 1Δ; futures options: 1 futures contract per 1Δ
-            units_per_contract = 100.0 if kind == 'equity' else 1.0
-            units_contrib = d * qty * units_per_contract
-
-            # CRITICAL FIX: Calculate option dollar delta properly
-            # Option dollar delta = delta × contracts × 100 × underlying_price
-            option_dollar_delta = d * qty * units_per_contract * price
+            for opt_symbol, _qty, _cached_delta in pending:
+                if opt_symbol not in underlyings_by_opt:
+                    underlyings_by_opt[opt_symbol] = self._get_underlying_symbol(opt_symbol)
 
-            # For delta bands, use notional value (contracts * 100 * spot price) instead of dollar delta
-            if kind == 'equity':
-                # For options: notional = abs(contracts) * 100 * spot price (always positive)
-                notional_contrib = abs(qty) * 100.0 * price
-            else:
-                # For futures: use dollar delta as before
-                notional_contrib = units_contrib * price * mult
-
-            # Removed verbose OPTION DELTA logging
+        # Always include the main underlying
+        relevant_underlyings = {algo.underlying_symbol, *underlyings_by_opt.values()}
 
-            g = groups[und_sym]
-            g['units'] += units_contrib
-            g['notional'] += notional_contrib
-            g['dollar_delta'] += option_dollar_delta
-            g['option_delta'] += option_dollar_delta
-            g['price'] = price
-            g['mult'] = mult
-            g['kind'] = kind
+        # (price, mult, kind) per subscribed underlying, read once and shared by every loop below
+        underlying_info = {}
+        for und_sym in relevant_underlyings | hedge_underlyings:
+            if und_sym in sec_symbols:
+                underlying_info[und_sym] = self._get_und_info(und_sym)
 
-        # Add each ACTIVE option position's delta contribution from positions dictionary (for pending trades)
-        for position in active_option_positions:
-            opt_sym = position['symbol']
-            if opt_sym not in self.algorithm.Securities:
+        # Include underlying holdings (avoid double counting with positions dictionary)
+        # Only underlyings actually invested are visited; the set comes from the Portfolio pass above
+        for und_sym in relevant_underlyings & invested_underlyings:
+            info = underlying_info.get(und_sym)
+            if info is None:
                 continue
 
-            # Skip if this position is already accounted for in filled_option_positions
-            already_accounted = False
-            for filled_pos in filled_option_positions:
-                if filled_pos['symbol'] == opt_sym:
-                    already_accounted = True
-                    break
-            
-            if already_accounted:
+            price, mult, kind = info
+            portfolio_qty = portfolio[und_sym].Quantity
+
+            # Skip if this holding is already tracked as a hedge position in our positions dictionary
+            # (hedge positions are matched by position ID pattern, not exact quantity)
+            if und_sym not in hedge_underlyings:
+                # Include Portfolio position in delta calculation
+                g = groups.get(und_sym)
+                if g is None:
+                    g = groups[und_sym] = _new_delta_group()
+                g['units'] += portfolio_qty
+                if need_notional:
+                    g['notional'] += portfolio_qty * (price if kind == 'equity' else price * mult)
+
+        # Option legs are gathered as (underlying, qty, price, mult, kind) plus a delta query per leg;
+        # deltas are resolved in one batch and the legs reduced in one pass
+        leg_meta = []
+        delta_queries = []
+
+        # CRITICAL FIX: FILLED option positions from QC Portfolio, plus ACTIVE ledger positions
+        # (for pending trades) not already accounted for there, as one stream of
+        # (option, underlying, qty, strike, expiration) rows
+        option_rows = [(pos.symbol, underlyings_by_opt[pos.symbol], pos.quantity, pos.strike, pos.expiration)
+                       for pos in filled_option_positions]
+        option_rows.extend((pos['symbol'], und_sym, pos['quantity'], pos['strike'], pos['expiration'])
+                           for und_sym, pos in active_option_positions
+                           if pos['symbol'] not in filled_option_symbols)
+
+        for opt_sym, und_sym, qty, strike, expiration in option_rows:
+            if opt_sym not in sec_symbols:
                 continue
 
-            opt_sec = self.algorithm.Securities[opt_sym]
-            und_sym = self._get_underlying_symbol(opt_sym)
-            if und_sym not in self.algorithm.Securities:
+            info = underlying_info.get(und_sym)
+            if info is None:
                 continue
 
-            und_sec = self.algorithm.Securities[und_sym]
-            price = und_sec.Price
-            kind = self._asset_kind(und_sym)
-            mult = self._fut_multiplier(und_sym) if kind == 'future' else 1.0
-            qty = position['quantity']
-
-            # Get delta via vol model abstraction
-            d, delta_source = self.algorithm.greeks_provider.get_delta(opt_sym, position['strike'], price, position['expiration'])
-
-            # Units-equivalent per contract (QC delta is per contract):
-            # Equity options: 100 shares per 1Δ; futures options: 1 futures contract per 1Δ
-            units_per_contract = 100.0 if kind == 'equity' else 1.0
-            units_contrib = d * qty * units_per_contract
+            price, mult, kind = info
+            leg_meta.append((und_sym, qty, price, mult, kind))
+            delta_queries.append((opt_sym, strike, price, expiration))
 
-            # CRITICAL FIX: Calculate option dollar delta properly
-            # Option dollar delta = delta × contracts × 100 × underlying_price
-            option_dollar_delta = d * qty * units_per_contract * price
-
-            # For delta bands, use notional value (contracts * 100 * spot price) instead of dollar delta
-            if kind == 'equity':
-                # For options: notional = abs(contracts) * 100 * spot price (always positive)
-                notional_contrib = abs(qty) * 100.0 * price
-            else:
-                # For futures: use dollar delta as before
-                notional_contrib = units_contrib * price * mult
-
-            # Removed verbose OPTION DELTA logging
-
-            g = groups[und_sym]
-            g['units'] += units_contrib
-            g['notional'] += notional_contrib
-            g['dollar_delta'] += option_dollar_delta
-            g['option_delta'] += option_dollar_delta
-            g['price'] = price
-            g['mult'] = mult
-            g['kind'] = kind
-
-        # Include hedge positions from the positions dictionary
-        hedge_positions_found = []
-        for pos_id, position in self.algorithm.positions.items():
-            if pos_id.startswith('hedge_'):
-                hedge_positions_found.append(f"{pos_id}: qty={position.get('quantity', 0)}, is_hedge={position.get('is_hedge', False)}")
+        # Get deltas via vol model abstraction
+        deltas = algo.greeks_provider.get_deltas(delta_queries)
+        option_legs = [(und_sym, d, qty, price, mult, kind)
+                       for (und_sym, qty, price, mult, kind), d in zip(leg_meta, deltas)]
+        self._accumulate_option_legs(groups, option_legs, need_notional)
 
+        # Include hedge positions from the positions dictionary (hedge partition only)
+        for pos_id, position in algo.positions_hedge.items():
             if (pos_id.startswith('hedge_') and
-                position.get('is_hedge', False) and
                 position.get('quantity', 0) != 0):
 
                 und_sym = position['symbol']
-                if und_sym not in self.algorithm.Securities:
+                info = underlying_info.get(und_sym)
+                if info is None:
                     continue
 
-                sec = self.algorithm.Securities[und_sym]
-                price = sec.Price
-                kind = self._asset_kind(und_sym)
-                mult = self._fut_multiplier(und_sym) if kind == 'future' else 1.0
+                price, mult, kind = info
                 qty = position['quantity']
 
                 # Hedge positions are equity positions, so delta = 1.0 per unit
@@ -341,114 +449,162 @@ class DeltaHedger:
                 # We only want to track option notional for delta bands
                 hedge_notional = 0  # Don't count hedge notional for delta bands
 
-                if und_sym not in groups:
-                    groups[und_sym] = {
-                        'units': 0,
-                        'notional': 0,
-                        'price': price,
-                        'mult': mult,
-                        'kind': kind,
-                        'dollar_delta': 0,  # Add separate dollar delta tracking
-                        'option_delta': 0,
-                        'hedge_delta': 0
-                    }
-
-                groups[und_sym]['dollar_delta'] += hedge_dollar_delta
-                groups[und_sym]['hedge_delta'] += hedge_dollar_delta
+                g = groups.get(und_sym)
+                if g is None:
+                    g = groups[und_sym] = _new_delta_group()
+
+                g['dollar_delta'] += hedge_dollar_delta
+                g['hedge_delta'] += hedge_dollar_delta
                 # Don't add hedge notional to the total - we only want option notional for delta bands
-                # groups[und_sym]['notional'] += hedge_notional
-                groups[und_sym]['price'] = price
-                groups[und_sym]['mult'] = mult
-                groups[und_sym]['kind'] = kind
+                # g['notional'] += hedge_notional
 
                 # Hedge position included in delta calculation
 
         # Removed verbose DELTA HEDGE SCAN logging
 
         # Include any pending option fills (symbol, quantity, cached_delta) not yet reflected in positions
+        # Pending legs go through the same reducer as filled/active legs, without notional
         if pending:
-            for item in pending:
-                if len(item) == 3:
-                    opt_symbol, qty, cached_delta = item
-                else:
-                    opt_symbol, qty = item
-                    cached_delta = 0.0
+            pending_legs = []
+            for opt_symbol, qty, cached_delta in pending:
                 try:
                     # Check if this trade is already filled to avoid double-counting
-                    already_filled = False
-                    for pos in self.algorithm.positions.values():
-                        if (pos.get('quantity', 0) != 0 and 
-                            not pos.get('is_hedge', False) and 
-                            pos['symbol'] == opt_symbol):
-                            already_filled = True
-                            break
-
-                    if already_filled:
+                    if opt_symbol in active_option_symbols:
                         continue
 
-                    if opt_symbol not in self.algorithm.Securities:
+                    if opt_symbol not in sec_symbols:
                         continue
-                    und_sym = self._get_underlying_symbol(opt_symbol)
-                    if und_sym not in self.algorithm.Securities:
+                    und_sym = underlyings_by_opt[opt_symbol]
+                    info = underlying_info.get(und_sym)
+                    if info is None:
                         continue
-                    und_sec = self.algorithm.Securities[und_sym]
-                    price = und_sec.Price
-                    kind = self._asset_kind(und_sym)
-                    mult = self._fut_multiplier(und_sym) if kind == 'future' else 1.0
+                    price, mult, kind = info
 
                     # Try QC Greeks first, fall back to cached delta
                     d = cached_delta
                     delta_source = "CACHED"
                     
-                    # Check if QC Greeks are available for this symbol
-                    if opt_symbol in self.algorithm.Securities:
-                        security = self.algorithm.Securities[opt_symbol]
-                        greeks = getattr(security, 'Greeks', None)
-                        if greeks and greeks.Delta is not None:
-                            d = float(greeks.Delta)
-                            delta_source = "QC"
+                    # Check if QC Greeks are available for this symbol (membership checked above)
+                    greeks = getattr(securities[opt_symbol], 'Greeks', None)
+                    qc_delta = greeks.Delta if greeks is not None else None
+                    if qc_delta is not None:
+                        d = float(qc_delta)
+                        delta_source = "QC"
                     
-                    units_per_contract = 100.0 if kind == 'equity' else 1.0
-                    units_contrib = d * float(qty) * units_per_contract
-                    
-                    # CRITICAL FIX: Calculate option dollar delta properly for pending trades
-                    # Option dollar delta = delta × contracts × 100 × underlying_price
-                    option_dollar_delta = d * float(qty) * units_per_contract * price
-                    
-                    # For delta bands, use notional value (contracts * 100 * spot price) instead of dollar delta
-                    if kind == 'equity':
-                        # For options: notional = abs(contracts) * 100 * spot price (always positive)
-                        notional_contrib = abs(float(qty)) * 100.0 * price
-                    else:
-                        # For futures: use dollar delta as before
-                        notional_contrib = units_contrib * price * mult
+                    pending_legs.append((und_sym, float(d), float(qty), price, mult, kind))
 
-                    if und_sym not in groups:
-                        groups[und_sym] = {'units': 0.0, 'notional': 0.0, 'price': price, 'mult': mult, 'kind': kind, 'dollar_delta': 0.0, 'option_delta': 0.0, 'hedge_delta': 0.0}
+                except Exception as e:
+                    if debug:
+                        algo.Debug(f"PENDING DELTA ERROR: {opt_symbol}: {e}")
 
-                    g = groups[und_sym]
-                    g['units'] += units_contrib
-                    g['dollar_delta'] += option_dollar_delta
-                    g['option_delta'] += option_dollar_delta
-                    # Don't add pending trade notional to avoid double-counting - it's already in existing positions
-                    # g['notional'] += notional_contrib
+            # Pending trade notional is not added to avoid double-counting - it's already in existing positions
+            self._accumulate_option_legs(groups, pending_legs, need_notional=False)
 
-                except Exception as e:
-                    if self.algorithm.debug_mode:
-                        self.algorithm.Debug(f"PENDING DELTA ERROR: {opt_symbol}: {e}")
+        # Per-underlying fields are written once here rather than on every contribution
+        for und_sym, g in groups.items():
+            price, mult, kind = underlying_info[und_sym]
+            g['price'] = price
+            g['mult'] = mult
+            g['kind'] = kind
+            g['per_unit_dollar'] = price if kind == 'equity' else price * mult
 
         return groups
 
-    def _nav_target_and_band(self, kind):
-        """Get NAV-based target and tolerance band with hysteresis"""
+    def _accumulate_option_legs(self, groups, option_legs, need_notional=True):
+        """
+        Add option leg delta contributions to groups.
+        Small books are summed in Python; from DELTA_VECTORIZE_MIN_LEGS legs up the
+        per-leg math is done on arrays and reduced per underlying with bincount,
+        or with the compiled kernel above DELTA_JIT_MIN_LEGS when numba is available.
+        Group price/mult/kind are left to the caller (set once per underlying).
+        """
+        if len(option_legs) < DELTA_VECTORIZE_MIN_LEGS:
+            # Accumulate into parallel per-underlying slots and touch the group dicts
+            # once per underlying rather than once per leg
+            und_index = {}
+            units_sum = []
+            notional_sum = []
+            dollar_sum = []
+            for und_sym, d, qty, price, mult, kind in option_legs:
+                i = und_index.get(und_sym)
+                if i is None:
+                    i = und_index[und_sym] = len(units_sum)
+                    units_sum.append(0.0)
+                    notional_sum.append(0.0)
+                    dollar_sum.append(0.0)
+
+                # Units-equivalent per contract (QC delta is per contract):
+                # Equity options: 100 shares per 1Δ; futures options: 1 futures contract per 1Δ
+                units_contrib = d * qty * (100.0 if kind == 'equity' else 1.0)
+                units_sum[i] += units_contrib
+
+                # Option dollar delta = delta × contracts × 100 × underlying_price
+                dollar_sum[i] += units_contrib * price
+
+                # For delta bands, use notional value (contracts * 100 * spot price) instead of dollar delta
+                if need_notional:
+                    if kind == 'equity':
+                        notional_sum[i] += abs(qty) * 100.0 * price
+                    else:
+                        notional_sum[i] += units_contrib * price * mult
+
+            for und_sym, i in und_index.items():
+                g = groups.get(und_sym)
+                if g is None:
+                    g = groups[und_sym] = _new_delta_group()
+                g['units'] += units_sum[i]
+                if need_notional:
+                    g['notional'] += notional_sum[i]
+                g['dollar_delta'] += dollar_sum[i]
+                g['option_delta'] += dollar_sum[i]
+            return
+
+        n = len(option_legs)
+        und_index = {}
+        und_idx = np.fromiter((und_index.setdefault(leg[0], len(und_index)) for leg in option_legs), dtype=np.int64, count=n)
+        d_arr = np.fromiter((leg[1] for leg in option_legs), dtype=np.float64, count=n)
+        qty_arr = np.fromiter((leg[2] for leg in option_legs), dtype=np.float64, count=n)
+        price_arr = np.fromiter((leg[3] for leg in option_legs), dtype=np.float64, count=n)
+        mult_arr = np.fromiter((leg[4] for leg in option_legs), dtype=np.float64, count=n)
+        is_equity = np.fromiter((leg[5] == 'equity' for leg in option_legs), dtype=bool, count=n)
+
+        n_groups = len(und_index)
+        if _reduce_leg_deltas is not None and n > DELTA_JIT_MIN_LEGS:
+            units_sum, notional_sum, dollar_sum = _reduce_leg_deltas(
+                d_arr, qty_arr, price_arr, mult_arr, is_equity, und_idx, n_groups)
+        else:
+            units_contrib = d_arr * qty_arr * np.where(is_equity, 100.0, 1.0)
+            dollar_contrib = units_contrib * price_arr
+
+            units_sum = np.bincount(und_idx, weights=units_contrib, minlength=n_groups)
+            notional_sum = None
+            if need_notional:
+                notional_contrib = np.where(is_equity, np.abs(qty_arr) * 100.0 * price_arr, dollar_contrib * mult_arr)
+                notional_sum = np.bincount(und_idx, weights=notional_contrib, minlength=n_groups)
+            dollar_sum = np.bincount(und_idx, weights=dollar_contrib, minlength=n_groups)
+
+        for und_sym, i in und_index.items():
+            g = groups.get(und_sym)
+            if g is None:
+                g = groups[und_sym] = _new_delta_group()
+            g['units'] += float(units_sum[i])
+            if need_notional:
+                g['notional'] += float(notional_sum[i])
+            g['dollar_delta'] += float(dollar_sum[i])
+            g['option_delta'] += float(dollar_sum[i])
+
+    def _nav_target_and_band(self, kind, nav=None):
+        """Get NAV-based target and tolerance band with hysteresis (nav: caller's TotalPortfolioValue snapshot)"""
+        if nav is None:
+            nav = self.algorithm.Portfolio.TotalPortfolioValue
         if kind == 'equity':
-            tgt = self.algorithm.Portfolio.TotalPortfolioValue * self.algorithm.delta_target_nav_pct_equity
-            tol = self.algorithm.Portfolio.TotalPortfolioValue * self.algorithm.delta_tol_nav_pct_equity
+            tgt = nav * self.algorithm.delta_target_nav_pct_equity
+            tol = nav * self.algorithm.delta_tol_nav_pct_equity
             # Add hysteresis buffer to prevent oscillation (5% of tolerance)
             hysteresis_buffer = tol * 0.05
         else:
-            tgt = self.algorithm.Portfolio.TotalPortfolioValue * self.algorithm.delta_target_nav_pct_future
-            tol = self.algorithm.Portfolio.TotalPortfolioValue * self.algorithm.delta_tol_nav_pct_future
+            tgt = nav * self.algorithm.delta_target_nav_pct_future
+            tol = nav * self.algorithm.delta_tol_nav_pct_future
             hysteresis_buffer = tol * 0.05
 
         # Apply hysteresis: widen the "no-action" zone slightly
@@ -486,76 +642,116 @@ class DeltaHedger:
         4. Hedge with underlying if margin allows
         5. Reduce option positions if margin doesn't allow
         """
-        # Get active positions only (quantity != 0)
-        active_positions = [pos for pos_id, pos in self.algorithm.positions.items() if pos.get('quantity', 0) != 0]
+        algo = self.algorithm
+        debug = algo.debug_mode
+        securities = algo.Securities
+        portfolio = algo.Portfolio
+
+        # Also check for pending option trades that would create positions
+        # Legs passed in by the caller count as pending options as well
+        pending_options = getattr(algo, 'todays_new_trades', [])
+        has_pending_options = len(pending_options) > 0 or bool(pending)
+
+        # Fast path: empty ledger, nothing pending and no hedge holding -> nothing to hedge or clear
+        if (not algo.positions and not has_pending_options and
+                not portfolio[algo.underlying_symbol].Invested):
+            return False
 
         # Only clear hedges if there are NO option positions anywhere (active or pending)
+        # The active list is handed to compute_delta_groups below rather than rebuilt there
+        active_option_positions = self._active_option_positions()
         option_positions_exist = any(
-            pos.get('symbol', '').SecurityType == SecurityType.Option and pos.get('quantity', 0) != 0
-            for pos in active_positions
+            getattr(pos.get('symbol'), 'SecurityType', None) == SecurityType.Option
+            for _, pos in active_option_positions
         )
 
-        # Also check for pending option trades that would create positions
-        pending_options = getattr(self.algorithm, 'todays_new_trades', [])
-        has_pending_options = len(pending_options) > 0
-
         if not option_positions_exist and not has_pending_options:
-            underlying_symbol = self.algorithm.underlying_symbol
-            if underlying_symbol in self.algorithm.Securities:
-                current_qty = self.algorithm.Portfolio[underlying_symbol].Quantity
+            underlying_symbol = algo.underlying_symbol
+            if underlying_symbol in securities:
+                current_qty = portfolio[underlying_symbol].Quantity
                 if current_qty != 0:
-                    if self.algorithm.debug_mode:
-                        self.algorithm.Debug(f"HEDGE CLEAR: No option positions (active or pending), liquidating {current_qty} shares")
+                    if debug:
+                        algo.Debug(f"HEDGE CLEAR: No option positions (active or pending), liquidating {current_qty} shares")
 
                     # Clear hedge positions from our ledger
-                    hedge_positions_to_remove = []
-                    for pos_id, position in self.algorithm.positions.items():
-                        if (position.get('is_hedge', False) and
-                            position['symbol'] == underlying_symbol):
-                            hedge_positions_to_remove.append(pos_id)
+                    hedge_positions_to_remove = [pos_id for pos_id, position in algo.positions_hedge.items()
+                                                 if position['symbol'] == underlying_symbol]
 
                     for pos_id in hedge_positions_to_remove:
-                        if self.algorithm.debug_mode:
-                            self.algorithm.Debug(f"Removing hedge position {pos_id} from ledger")
-                        del self.algorithm.positions[pos_id]
+                        if debug:
+                            algo.Debug(f"Removing hedge position {pos_id} from ledger")
+                        algo.remove_position(pos_id)
 
-                    self.algorithm.Liquidate(underlying_symbol, tag="No active options, clearing hedge")
+                    algo.Liquidate(underlying_symbol, tag="No active options, clearing hedge")
                     return True
             return False
         
-        groups = self.compute_delta_groups(pending)
+        # Bands here are in dollar delta; the notional accumulator is only read by analytics
+        groups = self.compute_delta_groups(pending, need_notional=False,
+                                           active_option_positions=active_option_positions)
         did_trade = False
 
+        # Min-interval gate: a repeat pass shortly after the last one is skipped unless some
+        # underlying's dollar delta moved. Guards repeat invocations only; the daily P2 pass
+        # (currently the sole caller) is always far outside the interval.
+        now = algo.Time
+        group_deltas = {und: g['dollar_delta'] for und, g in groups.items()}
+        last_deltas = self._last_group_deltas
+        if (self._last_rebalance_time is not None and
+                (now - self._last_rebalance_time).total_seconds() < algo.min_rebalance_interval_s):
+            max_move = max((abs(group_deltas.get(und, 0.0) - last_deltas.get(und, 0.0))
+                            for und in group_deltas.keys() | last_deltas.keys()), default=0.0)
+            if max_move < algo.rebalance_delta_epsilon:
+                if debug:
+                    algo.Debug(f"P2 REBALANCE SKIP: last pass {self._last_rebalance_time}, "
+                               f"largest per-underlying delta move ${max_move:,.0f}")
+                return False
+        self._last_rebalance_time = now
+        self._last_group_deltas = group_deltas
+
+        # Mode flags are resolved once at Initialize
+        is_nav_band = algo.delta_band_is_nav
+        is_target_revert = algo.delta_revert_is_target
+        # NAV bands depend only on asset kind, so compute each at most once per pass
+        nav_bands = {}
+        # (submit method, args) for hedges/reductions, placed after all groups are evaluated
+        deferred_orders = []
+
+        # Partition by asset kind so equity and futures groups are processed contiguously
+        equity_groups = [(und_sym, g) for und_sym, g in groups.items() if g['kind'] == 'equity']
+        future_groups = [(und_sym, g) for und_sym, g in groups.items() if g['kind'] != 'equity']
+
+        # 1. Determine margin left: read once per pass, then the loop adds each queued hedge's
+        #    requirement itself (orders are deferred, so margin cannot move until after the loop)
+        try:
+            # Get margin information from Portfolio
+            current_margin_used = float(portfolio.TotalMarginUsed)
+            current_margin_remaining = float(portfolio.MarginRemaining)
+            portfolio_value = float(portfolio.TotalPortfolioValue)
+            current_margin_utilization = current_margin_used / portfolio_value if portfolio_value > 0 else 0
+        except AttributeError:
+            # Fallback: estimate margin usage from positions
+            current_margin_used = 0.0
+            current_margin_remaining = float(portfolio.TotalPortfolioValue)
+            portfolio_value = float(portfolio.TotalPortfolioValue)
+            current_margin_utilization = 0.0
+            
+            # Estimate margin from option positions
+            for pos in algo.positions.values():
+                if pos.get('estimated_margin', 0) > 0:
+                    current_margin_used += pos['estimated_margin']
+            
+            current_margin_remaining = portfolio_value - current_margin_used
+            current_margin_utilization = current_margin_used / portfolio_value if portfolio_value > 0 else 0
+        
         # HOLISTIC P2 LOGIC: Check margin constraints before hedging
-        for und_sym, g in groups.items():
+        for und_sym, g in equity_groups + future_groups:
             # Skip if no positions for this underlying
             if g['dollar_delta'] == 0:
                 continue
                 
-            # 1. Determine margin left
-            try:
-                # Get margin information from Portfolio
-                current_margin_used = float(self.algorithm.Portfolio.TotalMarginUsed)
-                current_margin_remaining = float(self.algorithm.Portfolio.MarginRemaining)
-                portfolio_value = float(self.algorithm.Portfolio.TotalPortfolioValue)
-                current_margin_utilization = current_margin_used / portfolio_value if portfolio_value > 0 else 0
-            except AttributeError:
-                # Fallback: estimate margin usage from positions
-                current_margin_used = 0.0
-                current_margin_remaining = float(self.algorithm.Portfolio.TotalPortfolioValue)
-                portfolio_value = float(self.algorithm.Portfolio.TotalPortfolioValue)
-                current_margin_utilization = 0.0
-                
-                # Estimate margin from option positions
-                for pos in self.algorithm.positions.values():
-                    if pos.get('estimated_margin', 0) > 0:
-                        current_margin_used += pos['estimated_margin']
-                
-                current_margin_remaining = portfolio_value - current_margin_used
-                current_margin_utilization = current_margin_used / portfolio_value if portfolio_value > 0 else 0
-            
-            if self.algorithm.debug_mode:
-                self.algorithm.Debug(f"P2 MARGIN CHECK: Used=${current_margin_used:,.0f}, Remaining=${current_margin_remaining:,.0f}, Util={current_margin_utilization:.1%}")
+            if debug:
+                algo.Debug(f"P2 MARGIN CHECK: Used=${current_margin_used:,.0f}, Remaining=${current_margin_remaining:,.0f}, Util={current_margin_utilization:.1%}")
             
             # 2. Determine if rebalancing needed
             cur_dollar_delta = g['dollar_delta']
@@ -564,8 +760,11 @@ class DeltaHedger:
             mult = g['mult']
             
             # Use configured delta band mode (TRADE or NAV)
-            if getattr(self.algorithm, 'delta_band_mode', 'TRADE').upper() == 'NAV':
-                target_notional, (lo_notional, hi_notional) = self._nav_target_and_band(kind)
+            if is_nav_band:
+                bands = nav_bands.get(kind)
+                if bands is None:
+                    bands = nav_bands[kind] = self._nav_target_and_band(kind, portfolio_value)
+                target_notional, (lo_notional, hi_notional) = bands
                 base_notional = None  # Not used in NAV mode, only for TRADE mode logging
             else:
                 # TRADE mode: use trade notional
@@ -575,19 +774,19 @@ class DeltaHedger:
             # Check if within tolerance band
             in_band = lo_notional <= cur_dollar_delta <= hi_notional
             
-            if self.algorithm.debug_mode:
+            if debug:
                 is_outside = cur_dollar_delta < lo_notional or cur_dollar_delta > hi_notional
-                self.algorithm.Debug(f"DELTA BANDS {und_sym}: "
-                                   f"current=${cur_dollar_delta:,.0f}, target=${target_notional:,.0f}, "
-                                   f"band=[${lo_notional:,.0f}, ${hi_notional:,.0f}], "
-                                   f"outside_band={is_outside}")
+                algo.Debug(f"DELTA BANDS {und_sym}: "
+                           f"current=${cur_dollar_delta:,.0f}, target=${target_notional:,.0f}, "
+                           f"band=[${lo_notional:,.0f}, ${hi_notional:,.0f}], "
+                           f"outside_band={is_outside}")
             
             if in_band:
                 continue  # No rebalancing needed
             
             # 3. Check if underlying hedge would exceed overnight margin max
             # Determine desired dollar delta (TARGET = midpoint, BAND = nearest boundary)
-            if self.algorithm.delta_revert_mode.upper() == "TARGET":
+            if is_target_revert:
                 desired_dollar_delta = target_notional
                 revert_label = "target"
             else:  # BAND
@@ -595,7 +794,7 @@ class DeltaHedger:
                 revert_label = "boundary"
             
             delta_dollar_delta = desired_dollar_delta - cur_dollar_delta
-            units_to_trade = int(round(delta_dollar_delta / (price if kind == 'equity' else price * mult)))
+            units_to_trade = _iround(delta_dollar_delta / g['per_unit_dollar'])
             
             if units_to_trade == 0:
                 continue
@@ -608,68 +807,65 @@ class DeltaHedger:
             projected_margin_used = current_margin_used + hedge_margin_requirement
             projected_margin_utilization = projected_margin_used / portfolio_value if portfolio_value > 0 else 0
             
-            overnight_margin_max = getattr(self.algorithm, 'overnight_margin_max', 0.95)
+            overnight_margin_max = getattr(algo, 'overnight_margin_max', 0.95)
             
-            if self.algorithm.debug_mode:
-                self.algorithm.Debug(f"P2 HEDGE ANALYSIS: Need {units_to_trade:+d} shares, cost=${hedge_cost:,.0f}")
-                self.algorithm.Debug(f"P2 MARGIN PROJECTION: Current={current_margin_utilization:.1%}, Projected={projected_margin_utilization:.1%}, Max={overnight_margin_max:.1%}")
+            if debug:
+                algo.Debug(f"P2 HEDGE ANALYSIS: Need {units_to_trade:+d} shares, cost=${hedge_cost:,.0f}")
+                algo.Debug(f"P2 MARGIN PROJECTION: Current={current_margin_utilization:.1%}, Projected={projected_margin_utilization:.1%}, Max={overnight_margin_max:.1%}")
             
             # 4. Hedge with underlying if margin allows
             if (projected_margin_utilization <= overnight_margin_max and 
-                getattr(self.algorithm, 'p2_underlying_hedge_enabled', True)):
+                getattr(algo, 'p2_underlying_hedge_enabled', True)):
                 
-                if self.algorithm.debug_mode:
-                    self.algorithm.Debug(f"P2 UNDERLYING HEDGE: {und_sym} {units_to_trade:+d} shares | Δ${delta_dollar_delta:,.0f} (to {revert_label})")
+                if debug:
+                    algo.Debug(f"P2 UNDERLYING HEDGE: {und_sym} {units_to_trade:+d} shares | Δ${delta_dollar_delta:,.0f} (to {revert_label})")
                 
-                # Execute underlying hedge (existing logic)
-                success = self._execute_underlying_hedge(und_sym, units_to_trade, kind, price, cur_dollar_delta, desired_dollar_delta, revert_label, base_notional, lo_notional, hi_notional)
-                if success:
-                    did_trade = True
+                # Execute underlying hedge (existing logic) once every group has been evaluated
+                deferred_orders.append((self._execute_underlying_hedge, (und_sym, units_to_trade, kind, price, cur_dollar_delta, desired_dollar_delta, revert_label, base_notional, lo_notional, hi_notional)))
+                # Count the queued hedge against margin so later groups see the projected usage
+                current_margin_used = projected_margin_used
+                current_margin_remaining -= hedge_margin_requirement
+                current_margin_utilization = projected_margin_utilization
                     
             # 5. Reduce option positions if margin doesn't allow
             elif (projected_margin_utilization > overnight_margin_max and 
-                  getattr(self.algorithm, 'p2_option_reduction_enabled', True)):
+                  getattr(algo, 'p2_option_reduction_enabled', True)):
                 
-                if self.algorithm.debug_mode:
-                    self.algorithm.Debug(f"P2 OPTION REDUCTION: Margin would exceed {overnight_margin_max:.1%}, reducing option positions instead")
+                if debug:
+                    algo.Debug(f"P2 OPTION REDUCTION: Margin would exceed {overnight_margin_max:.1%}, reducing option positions instead")
                 
-                # Execute option position reduction
-                success = self._execute_option_position_reduction(und_sym, delta_dollar_delta, cur_dollar_delta, desired_dollar_delta, revert_label)
-                if success:
-                    did_trade = True
+                # Execute option position reduction once every group has been evaluated
+                deferred_orders.append((self._execute_option_position_reduction, (und_sym, delta_dollar_delta, cur_dollar_delta, desired_dollar_delta, revert_label)))
+
+        # Submit after the scan so fill events from one underlying's orders cannot
+        # change positions or margin while other groups are still being evaluated
+        for submit, args in deferred_orders:
+            if submit(*args):
+                did_trade = True
 
         return did_trade
 
     def _execute_underlying_hedge(self, und_sym, units_to_trade, kind, price, cur_dollar_delta, desired_dollar_delta, revert_label, base_notional, lo_notional, hi_notional):
         """Execute underlying hedge with existing logic"""
+        debug = self.algorithm.debug_mode
         try:
             # Net out any existing open orders to avoid double hedging
-            open_qty = 0
-            for order_ticket in self.algorithm.Transactions.GetOpenOrders(und_sym):
-                open_qty += order_ticket.Quantity
-
-            units_to_trade -= int(open_qty)
+            units_to_trade -= self._get_open_net_qty(und_sym)
 
             # Guard against zero-quantity orders after netting
             if units_to_trade == 0:
-                if self.algorithm.debug_mode:
+                if debug:
                     self.algorithm.Debug(f"P2 HEDGE SKIP: {und_sym} - existing open orders net to zero additional hedge needed")
                 return False
 
             # Skip if market closed for underlying
-            try:
-                if not self.algorithm.IsMarketOpen(und_sym):
-                    if self.algorithm.debug_mode:
-                        self.algorithm.Debug(f"P2 HEDGE SKIP: {und_sym} - market closed")
-                    return False
-            except Exception:
-                pass
-
-            # Final guard: don't submit zero-quantity orders
-            if units_to_trade == 0:
+            if not self._is_market_open(und_sym):
+                if debug:
+                    self.algorithm.Debug(f"P2 HEDGE SKIP: {und_sym} - market closed")
                 return False
 
             # Place the hedge order
+            qty = int(units_to_trade)
             if not self.algorithm.intraday_hedging:
                 # EOD: use close price limit orders
                 close_price = self.algorithm.Securities[und_sym].Close
@@ -677,16 +873,16 @@ class DeltaHedger:
                     close_price = price
                 close_price = round(close_price, 2)
 
-                qty = int(units_to_trade)
                 price = float(close_price)
                 ticket = self.algorithm.LimitOrder(und_sym, qty, price, tag=self.algorithm.HEDGE_TAG)
-                if self.algorithm.debug_mode:
+                self._open_qty_cache.pop(und_sym, None)
+                if debug:
                     self.algorithm.Debug(f"P2 EOD HEDGE: {und_sym} {units_to_trade:+d} "
                                       f"{'shares' if kind=='equity' else 'contracts'} @ ${close_price:.2f}")
             else:
                 # Intraday: market orders
-                qty = int(units_to_trade)
                 ticket = self.algorithm.MarketOrder(und_sym, qty, tag=self.algorithm.HEDGE_TAG)
+                self._open_qty_cache.pop(und_sym, None)
 
             if ticket.Status in (OrderStatus.Submitted, OrderStatus.Filled):
                 # Enhanced logging - handle NAV mode (base_notional is None) vs TRADE mode
@@ -711,7 +907,7 @@ class DeltaHedger:
                 return True
 
         except Exception as e:
-            if self.algorithm.debug_mode:
+            if debug:
                 self.algorithm.Debug(f"P2 underlying hedge error on {und_sym}: {e}")
         
         return False
@@ -722,173 +918,240 @@ class DeltaHedger:
         This matches the same calculation used in risk_manager.py but with current prices.
         """
         try:
-            # Reg-T style margin estimation for short puts
-            otm = max(0.0, underlying_price - strike)  # Out-of-the-money amount
-            
-            # Two common Reg-T floors
-            estimate1 = 0.20 * underlying_price * 100 - otm * 100 + option_price * 100  # 20% underlying - OTM + premium
-            estimate2 = 0.10 * underlying_price * 100 + option_price * 100              # 10% underlying + premium
-            pct_floor = getattr(self.algorithm, 'estimated_margin_pct', 0.10) * strike * 100  # Config percentage floor
-            
-            estimated_margin_per_contract = max(estimate1, estimate2, pct_floor)
-            estimated_margin_per_contract = max(500, estimated_margin_per_contract)  # Small hard floor
-            
-            return estimated_margin_per_contract
+            # Reg-T style margin estimation for short puts, memoized on cent-quantized inputs
+            return _margin_per_contract(round(strike * 100), round(option_price * 100), round(underlying_price * 100),
+                                        getattr(self.algorithm, 'estimated_margin_pct', 0.10))
         except Exception as e:
             if self.algorithm.debug_mode:
                 self.algorithm.Debug(f"Error calculating current margin per contract: {e}")
             return 1000.0  # Fallback margin estimate
 
+    def _score_reduction_candidates(self, option_positions):
+        """
+        Set delta_efficiency, size_factor, dte_factor, pnl_factor and reduction_score on each
+        candidate (reads delta, quantity, estimated_margin, entry_price, current_price, dte).
+        From DELTA_VECTORIZE_MIN_LEGS candidates up the factors are computed on arrays,
+        with the compiled kernel above DELTA_JIT_MIN_LEGS when numba is available.
+        """
+        # Combined score uses config weights
+        delta_weight = getattr(self.algorithm, 'p2_delta_efficiency_weight', 0.4)
+        size_weight = getattr(self.algorithm, 'p2_size_factor_weight', 0.2)
+        dte_weight = getattr(self.algorithm, 'p2_dte_factor_weight', 0.2)
+        pnl_weight = getattr(self.algorithm, 'p2_pnl_factor_weight', 0.2)
+
+        if len(option_positions) < DELTA_VECTORIZE_MIN_LEGS:
+            for pos in option_positions:
+                # Delta efficiency (delta per margin dollar)
+                delta_contribution = abs(pos.delta * pos.quantity * 100)
+                margin = pos.estimated_margin
+                pos.delta_efficiency = delta_contribution / margin if margin > 0 else 0
+
+                # Size factor (prefer larger positions for reduction)
+                pos.size_factor = min(abs(pos.quantity) / 50, 1.0)  # Normalize to 50 contracts
+
+                # DTE factor (prefer reducing near-expiration)
+                dte = pos.dte
+                pos.dte_factor = max(0, (30 - dte) / 30) if dte is not None and dte < 30 else 0
+
+                # P&L factor (prefer reducing losing positions)
+                entry_price = pos.entry_price
+                current_price = pos.current_price
+                if entry_price > 0 and current_price > 0:
+                    pnl_pct = (current_price - entry_price) / entry_price
+                    pos.pnl_factor = max(0, -pnl_pct)  # Positive for losing positions
+                else:
+                    pos.pnl_factor = 0
+
+                pos.reduction_score = (
+                    pos.delta_efficiency * delta_weight +
+                    pos.size_factor * size_weight +
+                    pos.dte_factor * dte_weight +
+                    pos.pnl_factor * pnl_weight
+                )
+            return
+
+        n = len(option_positions)
+        qty = np.fromiter((p.quantity for p in option_positions), dtype=np.float64, count=n)
+        delta = np.fromiter((p.delta for p in option_positions), dtype=np.float64, count=n)
+        margin = np.fromiter((p.estimated_margin for p in option_positions), dtype=np.float64, count=n)
+        entry_price = np.fromiter((p.entry_price for p in option_positions), dtype=np.float64, count=n)
+        current_price = np.fromiter((p.current_price for p in option_positions), dtype=np.float64, count=n)
+        # Unknown expiry scores like dte >= 30 (no DTE preference)
+        dte = np.fromiter((30 if p.dte is None else p.dte for p in option_positions), dtype=np.float64, count=n)
+
+        if _score_positions is not None and n > DELTA_JIT_MIN_LEGS:
+            delta_eff, size_fac, dte_fac, pnl_fac, score = _score_positions(
+                qty, delta, margin, entry_price, current_price, dte,
+                float(delta_weight), float(size_weight), float(dte_weight), float(pnl_weight))
+        else:
+            delta_eff = np.where(margin > 0, np.abs(delta * qty * 100) / np.where(margin > 0, margin, 1.0), 0.0)
+            size_fac = np.minimum(np.abs(qty) / 50, 1.0)
+            dte_fac = np.where(dte < 30, np.maximum(0.0, (30 - dte) / 30), 0.0)
+            has_prices = (entry_price > 0) & (current_price > 0)
+            pnl_fac = np.where(has_prices,
+                               np.maximum(0.0, -(current_price - entry_price) / np.where(entry_price > 0, entry_price, 1.0)),
+                               0.0)
+            score = delta_eff * delta_weight + size_fac * size_weight + dte_fac * dte_weight + pnl_fac * pnl_weight
+
+        for pos, eff, size_f, dte_f, pnl_f, sc in zip(option_positions, delta_eff.tolist(), size_fac.tolist(),
+                                                      dte_fac.tolist(), pnl_fac.tolist(), score.tolist()):
+            pos.delta_efficiency = eff
+            pos.size_factor = size_f
+            pos.dte_factor = dte_f
+            pos.pnl_factor = pnl_f
+            pos.reduction_score = sc
+
+    @contextmanager
+    def _profile_section(self, name):
+        """cProfile the enclosed block and log its top 10 cumulative functions when profile_hedging is set"""
+        if not getattr(self.algorithm, 'profile_hedging', False):
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(10)
+            self.algorithm.Log(f"PROFILE {name}:\n{out.getvalue()}")
+
     def _execute_option_position_reduction(self, und_sym, delta_dollar_delta, cur_dollar_delta, desired_dollar_delta, revert_label):
+        """Execute option position reduction, profiled when profile_hedging is enabled"""
+        with self._profile_section(f"P2 option reduction {und_sym}"):
+            return self._reduce_option_positions(und_sym, delta_dollar_delta, cur_dollar_delta, desired_dollar_delta, revert_label)
+
+    def _reduce_option_positions(self, und_sym, delta_dollar_delta, cur_dollar_delta, desired_dollar_delta, revert_label):
         """Execute option position reduction using hybrid approach"""
+        algo = self.algorithm
+        debug = algo.debug_mode
+        securities = algo.Securities
+        now = algo.Time
         try:
             # Get all option positions for this underlying
             option_positions = []
-            for pos_id, pos in self.algorithm.positions.items():
-                if (pos.get('quantity', 0) != 0 and 
-                    not pos.get('is_hedge', False) and 
-                    pos.get('symbol') and 
-                    pos['symbol'].SecurityType == SecurityType.Option):
+            dust_skipped = 0
+            for pos_id, entry in algo.positions.items():
+                if (entry.get('quantity', 0) != 0 and 
+                    not entry.get('is_hedge', False) and 
+                    entry.get('symbol') and 
+                    entry['symbol'].SecurityType == SecurityType.Option):
                     
                     # Check if this option is for the current underlying
                     try:
-                        opt_und_sym = self._get_underlying_symbol(pos['symbol'])
+                        opt_und_sym = self._get_underlying_symbol(entry['symbol'])
                         if opt_und_sym == und_sym:
-                            option_positions.append({
-                                'pos_id': pos_id,
-                                'symbol': pos['symbol'],
-                                'quantity': pos['quantity'],
-                                'delta': pos.get('delta', 0.0),
-                                'strike': pos.get('strike', 0.0),
-                                'expiration': pos.get('expiration'),
-                                'entry_price': pos.get('entry_price', 0.0),
-                                'estimated_margin': pos.get('estimated_margin', 0.0)
-                            })
+                            # Dust: fractional size or a recorded entry delta too small to matter
+                            entry_delta = entry.get('delta')
+                            if abs(entry['quantity']) < 1 or (entry_delta is not None and abs(entry_delta) < 0.01):
+                                dust_skipped += 1
+                                continue
+                            option_positions.append(_ReductionCandidate(
+                                pos_id, entry['symbol'], entry['quantity'],
+                                entry.get('strike', 0.0), entry.get('expiration'),
+                                entry.get('entry_price', 0.0), entry.get('estimated_margin', 0.0)))
                     except Exception:
                         continue
             
+            if debug and dust_skipped:
+                algo.Debug(f"P2 OPTION REDUCTION: {dust_skipped} dust positions skipped for {und_sym}")
+            
             if not option_positions:
-                if self.algorithm.debug_mode:
-                    self.algorithm.Debug(f"P2 OPTION REDUCTION: No option positions found for {und_sym}")
+                if debug:
+                    algo.Debug(f"P2 OPTION REDUCTION: No option positions found for {und_sym}")
                 return False
             
             # Calculate hybrid scores for position selection
-            underlying_price = float(self.algorithm.Securities[und_sym].Price)
+            underlying_price = self._get_und_info(und_sym)[0]
+            
+            # Get current deltas using greeks_provider, one batch for the subscribed contracts
+            sec_symbols = algo.security_symbols()
+            priced = [pos for pos in option_positions if pos.symbol in sec_symbols]
+            deltas = algo.greeks_provider.get_deltas(
+                [(pos.symbol, pos.strike, underlying_price, pos.expiration)
+                 for pos in priced])
+            # Use current delta instead of cached delta; unsubscribed contracts keep zero delta/price
+            for pos, current_delta in zip(priced, deltas):
+                pos.delta = current_delta
+                pos.current_price = float(securities[pos.symbol].Price)
             
             for pos in option_positions:
-                # Get current option price and Greeks
-                current_price = 0.0
-                current_delta = 0.0
-                if pos['symbol'] in self.algorithm.Securities:
-                    current_price = float(self.algorithm.Securities[pos['symbol']].Price)
-                    # Get current delta using greeks_provider
-                    current_delta, _ = self.algorithm.greeks_provider.get_delta(
-                        pos['symbol'], 
-                        pos.get('strike', 0), 
-                        underlying_price, 
-                        pos.get('expiration', None)
-                    )
-                
-                # Use current delta instead of cached delta
-                pos['delta'] = current_delta
+                current_delta = pos.delta
+                current_price = pos.current_price
                 
                 # Reduced debug logging for position data (using current delta)
-                if self.algorithm.debug_mode:
-                    self.algorithm.Debug(
-                        f"P2 POSITION: {pos['symbol']} qty={pos['quantity']} Δ={current_delta:.3f} margin=${pos.get('estimated_margin', 0.0):,.0f}"
+                if debug:
+                    algo.Debug(
+                        f"P2 POSITION: {pos.symbol} qty={pos.quantity} Δ={current_delta:.3f} margin=${pos.estimated_margin:,.0f}"
                     )
                 
                 # Calculate CURRENT estimated margin (not cached from entry)
                 current_estimated_margin_per_contract = self._calculate_current_margin_per_contract(
-                    pos.get('strike', 0), 
+                    pos.strike, 
                     current_price, 
                     underlying_price
                 )
-                current_estimated_margin = current_estimated_margin_per_contract * abs(pos['quantity'])
-                pos['estimated_margin'] = current_estimated_margin
-                
-                # Calculate efficiency metrics
-                delta_contribution = abs(pos['delta'] * pos['quantity'] * 100)
-                margin_per_contract = current_estimated_margin_per_contract
-                
-                # Delta efficiency (delta per margin dollar)
-                pos['delta_efficiency'] = delta_contribution / current_estimated_margin if current_estimated_margin > 0 else 0
-                
-                # Reduced debug logging for efficiency metrics
-                if self.algorithm.debug_mode:
-                    self.algorithm.Debug(
-                        f"P2 EFFICIENCY: {pos['symbol']} Δ={current_delta:.3f} eff={pos['delta_efficiency']:.4f} contrib={delta_contribution:,.0f}"
-                    )
+                pos.estimated_margin = current_estimated_margin_per_contract * abs(pos.quantity)
                 
-                # Size factor (prefer larger positions for reduction)
-                pos['size_factor'] = min(abs(pos['quantity']) / 50, 1.0)  # Normalize to 50 contracts
-                
-                # DTE factor (prefer reducing near-expiration)
-                if pos['expiration']:
+                # Days to expiration (None when unknown)
+                pos.dte = None
+                if pos.expiration:
                     try:
-                        dte = (pos['expiration'] - self.algorithm.Time).days
-                        pos['dte_factor'] = max(0, (30 - dte) / 30) if dte < 30 else 0
-                    except:
-                        pos['dte_factor'] = 0
-                else:
-                    pos['dte_factor'] = 0
-                
-                # P&L factor (prefer reducing losing positions)
-                if pos['entry_price'] > 0 and current_price > 0:
-                    pnl_pct = (current_price - pos['entry_price']) / pos['entry_price']
-                    pos['pnl_factor'] = max(0, -pnl_pct)  # Positive for losing positions
-                else:
-                    pos['pnl_factor'] = 0
-                
-                # Combined score using config weights
-                delta_weight = getattr(self.algorithm, 'p2_delta_efficiency_weight', 0.4)
-                size_weight = getattr(self.algorithm, 'p2_size_factor_weight', 0.2)
-                dte_weight = getattr(self.algorithm, 'p2_dte_factor_weight', 0.2)
-                pnl_weight = getattr(self.algorithm, 'p2_pnl_factor_weight', 0.2)
-                
-                pos['reduction_score'] = (
-                    pos['delta_efficiency'] * delta_weight +
-                    pos['size_factor'] * size_weight +
-                    pos['dte_factor'] * dte_weight +
-                    pos['pnl_factor'] * pnl_weight
-                )
+                        pos.dte = (pos.expiration - now).days
+                    except Exception:
+                        pass
             
-            # Sort by combined score (highest first)
-            option_positions.sort(key=lambda p: p['reduction_score'], reverse=True)
+            self._score_reduction_candidates(option_positions)
             
-            if self.algorithm.debug_mode:
-                self.algorithm.Debug(f"P2 REDUCTION: {len(option_positions)} positions, need ${delta_dollar_delta:,.0f} delta reduction")
+            # Reduced debug logging for efficiency metrics
+            if debug:
+                for pos in option_positions:
+                    algo.Debug(
+                        f"P2 EFFICIENCY: {pos.symbol} Δ={pos.delta:.3f} eff={pos.delta_efficiency:.4f} "
+                        f"contrib={abs(pos.delta * pos.quantity * 100):,.0f}"
+                    )
+            
+            # Sort by combined score (highest first); ties go to the largest delta drift
+            # (|delta × qty|, i.e. dollar delta up to the common 100 × price factor)
+            option_positions.sort(key=lambda p: (p.reduction_score, abs(p.delta * p.quantity)), reverse=True)
+            
+            if debug:
+                algo.Debug(f"P2 REDUCTION: {len(option_positions)} positions, need ${delta_dollar_delta:,.0f} delta reduction")
                 # Show top 3 positions in compact format
                 for i, pos in enumerate(option_positions[:3]):
-                    self.algorithm.Debug(f"  {i+1}. {pos['symbol']}: score={pos['reduction_score']:.3f} eff={pos['delta_efficiency']:.3f}")
+                    algo.Debug(f"  {i+1}. {pos.symbol}: score={pos.reduction_score:.3f} eff={pos.delta_efficiency:.3f}")
             
             # Reduce positions until we achieve target delta reduction (in dollar-delta terms)
+            # Orders are planned first and then submitted together, so order events raised by
+            # one submission cannot disturb the selection of the remaining legs
             total_delta_reduced = 0.0
             positions_reduced_count = 0
             max_reduction_pct = getattr(self.algorithm, 'p2_option_reduction_max_pct', 0.20)
+            planned_delta_reduced = 0.0
+            target_abs = abs(delta_dollar_delta)
+            haircut_fraction = algo.mid_haircut_fraction
+            reduction_orders = []  # (pos, reduction_qty, rounded limit_price or None for market, reduction_delta_dollar, bid, ask)
             
             for pos in option_positions:
-                if total_delta_reduced >= abs(delta_dollar_delta):
+                if planned_delta_reduced >= target_abs:
                     break
                 
-                # Calculate how much to reduce this position
-                position_delta = pos['delta'] * pos['quantity'] * 100
-                
                 # Calculate remaining delta needed
-                remaining_delta_needed = abs(delta_dollar_delta) - total_delta_reduced
+                remaining_delta_needed = target_abs - planned_delta_reduced
                 if remaining_delta_needed <= 0:
                     break
                 
                 # Calculate exactly how many contracts needed to hit the target
-                delta_per_contract = abs(pos['delta']) * 100 * underlying_price
+                delta_per_contract = abs(pos.delta) * 100 * underlying_price
                 if delta_per_contract <= 0:
                     continue
                 
                 contracts_needed = int(remaining_delta_needed / delta_per_contract)
                 
                 # Use the smaller of: contracts needed for target, max percentage, or full position
-                max_reduction_contracts = int(abs(pos['quantity']) * max_reduction_pct)
-                max_reduction_contracts = min(contracts_needed, max_reduction_contracts, int(abs(pos['quantity'])))
+                max_reduction_contracts = int(abs(pos.quantity) * max_reduction_pct)
+                max_reduction_contracts = min(contracts_needed, max_reduction_contracts, int(abs(pos.quantity)))
                 
                 if max_reduction_contracts == 0:
                     continue
@@ -896,65 +1159,69 @@ class DeltaHedger:
                 # Calculate dollar-delta reduction from this position
                 # Option dollar-delta = delta × contracts × 100 × underlying_price
                 # We accumulate absolute reduction towards the target
-                reduction_delta_dollar = abs(pos['delta']) * max_reduction_contracts * 100 * underlying_price
+                reduction_delta_dollar = max_reduction_contracts * delta_per_contract
+                
+                # Skip dust legs that would close less than 1% of what is still needed
+                if reduction_delta_dollar < 0.01 * remaining_delta_needed:
+                    continue
+                planned_delta_reduced += reduction_delta_dollar
                 
-                if self.algorithm.debug_mode:
-                    self.algorithm.Debug(
-                        f"P2 REDUCING: {pos['symbol']} -{max_reduction_contracts} contracts, Δ${reduction_delta_dollar:,.0f}"
+                if debug:
+                    algo.Debug(
+                        f"P2 REDUCING: {pos.symbol} -{max_reduction_contracts} contracts, Δ${reduction_delta_dollar:,.0f}"
                     )
                 
-                # Execute the reduction
                 # If currently long (>0), sell (negative) to reduce; if short (<0), buy (positive) to reduce
-                reduction_qty = -max_reduction_contracts if pos['quantity'] > 0 else max_reduction_contracts
+                reduction_qty = -max_reduction_contracts if pos.quantity > 0 else max_reduction_contracts
                 
-                # Place limit order to close partial position using proper pricing
-                symbol = pos['symbol']
-                sec = self.algorithm.Securities[symbol]
+                # Limit price to close partial position using proper pricing
+                sec = securities[pos.symbol]
                 bid = float(getattr(sec, "BidPrice", 0) or 0)
                 ask = float(getattr(sec, "AskPrice", 0) or 0)
                 
+                limit_price = None
                 if bid > 0 and ask > 0:
-                    # Calculate limit price using same logic as fill model
-                    haircut_fraction = self.algorithm.mid_haircut_fraction
-                    mid = (bid + ask) / 2
-                    spread = ask - bid
-                    
-                    if reduction_qty > 0:  # Buying back (closing short position)
-                        limit_price = mid + haircut_fraction * spread
-                        limit_price = min(max(limit_price, bid), ask)  # Clamp to book
-                    else:  # Selling (closing long position)
-                        limit_price = mid - haircut_fraction * spread
-                        limit_price = min(max(limit_price, bid), ask)  # Clamp to book
-                    
-                    ticket = self.algorithm.LimitOrder(symbol, reduction_qty, round(limit_price, 2), tag=f"P2_REDUCTION_{pos['pos_id']}")
-                    if self.algorithm.debug_mode:
-                        self.algorithm.Debug(f"   - P2 REDUCTION limit order: {symbol} {reduction_qty:+d} @ ${limit_price:.2f} (bid={bid}, ask={ask})")
+                    # Calculate limit price using same logic as fill model:
+                    # buying back (closing short) pays up from mid, selling (closing long) gives up from mid
+                    sign = 1.0 if reduction_qty > 0 else -1.0
+                    limit_price = (bid + ask) * 0.5 + sign * haircut_fraction * (ask - bid)
+                    limit_price = round(min(max(limit_price, bid), ask), 2)  # Clamp to book, round to the tick once
+                
+                reduction_orders.append((pos, reduction_qty, limit_price, reduction_delta_dollar, bid, ask))
+            
+            # Execute the reductions
+            for pos, reduction_qty, limit_price, reduction_delta_dollar, bid, ask in reduction_orders:
+                symbol = pos.symbol
+                if limit_price is not None:
+                    ticket = algo.LimitOrder(symbol, reduction_qty, limit_price, tag=f"P2_REDUCTION_{pos.pos_id}")
+                    if debug:
+                        algo.Debug(f"   - P2 REDUCTION limit order: {symbol} {reduction_qty:+d} @ ${limit_price:.2f} (bid={bid}, ask={ask})")
                 else:
                     # Fallback to market order only if no quotes available
-                    ticket = self.algorithm.MarketOrder(pos['symbol'], reduction_qty, tag=f"P2_REDUCTION_{pos['pos_id']}")
-                    if self.algorithm.debug_mode:
-                        self.algorithm.Debug(f"   - P2 REDUCTION fallback market order: {symbol} {reduction_qty:+d} (no quotes)")
+                    ticket = algo.MarketOrder(symbol, reduction_qty, tag=f"P2_REDUCTION_{pos.pos_id}")
+                    if debug:
+                        algo.Debug(f"   - P2 REDUCTION fallback market order: {symbol} {reduction_qty:+d} (no quotes)")
                 
                 if ticket.Status in (OrderStatus.Submitted, OrderStatus.Filled):
                     total_delta_reduced += reduction_delta_dollar
                     positions_reduced_count += 1
                     
-                    self.algorithm.Log(
-                        f"P2 OPTION REDUCTION: {pos['symbol']} {reduction_qty:+d} contracts | "
-                        f"Δ${reduction_delta_dollar:,.0f} | Score={pos['reduction_score']:.3f} | "
+                    algo.Log(
+                        f"P2 OPTION REDUCTION: {symbol} {reduction_qty:+d} contracts | "
+                        f"Δ${reduction_delta_dollar:,.0f} | Score={pos.reduction_score:.3f} | "
                         f"Total reduced=${total_delta_reduced:,.0f}"
                     )
-            
+
             if total_delta_reduced > 0:
-                self.algorithm.Log(
+                algo.Log(
                     f"P2 OPTION REDUCTION COMPLETE: Reduced ${total_delta_reduced:,.0f} delta "
                     f"from {positions_reduced_count} positions"
                 )
                 return True
             
         except Exception as e:
-            if self.algorithm.debug_mode:
-                self.algorithm.Debug(f"P2 option position reduction error: {e}")
+            if debug:
+                algo.Debug(f"P2 option position reduction error: {e}")
         
         return False
 
@@ -962,6 +1229,7 @@ class DeltaHedger:
         """Per-trade hedge: hedge only the just-filled option exposure to the trade target (percent of base).
         Uses TRADE sizing config for equities; does nothing if symbol/underlying missing.
         """
+        debug = self.algorithm.debug_mode
         try:
             if option_symbol not in self.algorithm.Securities:
                 return False
@@ -970,23 +1238,16 @@ class DeltaHedger:
                 return False
 
             # Determine kind and price
-            kind = self._asset_kind(und_sym)
-            price = float(self.algorithm.Securities[und_sym].Price)
+            price, mult, kind = self._get_und_info(und_sym)
             if price <= 0:
                 return False
-            mult = self._fut_multiplier(und_sym) if kind == 'future' else 1.0
 
             # Compute delta for this option only
             # Get position details
             qty = float(position_quantity)
-            pos = None
-            for p in self.algorithm.positions.values():
-                if p.get('symbol') == option_symbol:
-                    pos = p
-                    break
-            if pos is None:
-                # Fallback to provided quantity
-                pass
+            # First ledger position on this contract, if any (otherwise fall back to provided quantity)
+            bucket = self.algorithm.positions_by_symbol.get(option_symbol)
+            pos = next(iter(bucket.values())) if bucket else None
 
             # Try to get delta from position data first (more reliable for immediate hedging)
             if pos and 'delta' in pos:
@@ -1016,23 +1277,20 @@ class DeltaHedger:
             # We hedge only the gap between desired and this trade's contribution
             delta_notional = target_notional - notional_contrib
             denom = price if kind == 'equity' else price * mult
-            units_to_trade = int(round(delta_notional / denom))
+            units_to_trade = _iround(delta_notional / denom)
             
-            if self.algorithm.debug_mode:
+            if debug:
                 self.algorithm.Debug(f"HEDGE: {und_sym} {units_to_trade} units | base ${base_notional/1000:.0f}K|target ${target_notional/1000:.0f}K|contrib ${notional_contrib/1000:.0f}K|delta ${delta_notional/1000:.0f}K")
 
             if units_to_trade == 0:
-                if self.algorithm.debug_mode:
+                if debug:
                     self.algorithm.Debug(f"HEDGE SKIP (PER-TRADE): {und_sym} - delta_notional=${delta_notional:.0f} results in 0 units")
                 return False
 
             # Net out open orders
-            open_qty = 0
-            for order_ticket in self.algorithm.Transactions.GetOpenOrders(und_sym):
-                open_qty += order_ticket.Quantity
-            units_to_trade -= int(open_qty)
+            units_to_trade -= self._get_open_net_qty(und_sym)
             if units_to_trade == 0:
-                if self.algorithm.debug_mode:
+                if debug:
                     self.algorithm.Debug(f"HEDGE SKIP (PER-TRADE): {und_sym} - existing open orders net to zero")
                 return False
 
@@ -1045,7 +1303,7 @@ class DeltaHedger:
                         max_units = int((remaining * 0.9) / float(price))
                         units_to_trade = int(max_units if units_to_trade > 0 else -max_units)
                         if units_to_trade == 0:
-                            if self.algorithm.debug_mode:
+                            if debug:
                                 self.algorithm.Debug(f"HEDGE SKIP (PER-TRADE): {und_sym} - insufficient buying power")
                             return False
                 except Exception:
@@ -1055,10 +1313,11 @@ class DeltaHedger:
             # Create a unique hedge tag that includes the option symbol for per-trade hedging
             hedge_tag = f"{self.algorithm.HEDGE_TAG}_{option_symbol}"
             ticket = self.algorithm.MarketOrder(und_sym, qty_to_send, tag=hedge_tag)
+            self._open_qty_cache.pop(und_sym, None)
             if ticket.Status in (OrderStatus.Submitted, OrderStatus.Filled):
                 return True
         except Exception as e:
-            if self.algorithm.debug_mode:
+            if debug:
                 self.algorithm.Debug(f"Per-trade hedge error: {e}")
         return False
 
@@ -1101,10 +1360,10 @@ class DeltaHedger:
                     continue
                 if sym not in self.algorithm.Securities:
                     continue
-                sec = self.algorithm.Securities[sym]
-                if hasattr(sec, 'Greeks') and sec.Greeks is not None and sec.Greeks.Delta is not None:
-                    actual_delta = float(sec.Greeks.Delta)
-                    portfolio_delta += actual_delta * float(position.get('quantity', 0)) * 100.0
+                greeks = getattr(self.algorithm.Securities[sym], 'Greeks', None)
+                actual_delta = greeks.Delta if greeks is not None else None
+                if actual_delta is not None:
+                    portfolio_delta += float(actual_delta) * float(position.get('quantity', 0)) * 100.0
 
             hedge_shares = self.algorithm.target_delta - portfolio_delta
             if abs(hedge_shares) > self.algorithm.delta_tolerance:
@@ -1130,22 +1389,17 @@ class DeltaHedger:
         if self.algorithm.debug_mode:
             self.algorithm.Debug(f"_TRADE_BASE_NOTIONAL: und_sym={und_sym}, pending={pending}")
 
-        # Include filled option positions
-        for pos in [p for p in self.algorithm.positions.values()
-                    if p.get('quantity', 0) != 0 and not p.get('is_hedge', False)]:
-            try:
-                if self._get_underlying_symbol(pos['symbol']) != und_sym:
-                    continue
-            except Exception:
-                continue
+        # Include filled option positions (only this underlying's bucket of the ledger index)
+        active_positions = [p for p in self.algorithm.positions_by_underlying.get(und_sym, {}).values()
+                            if p.get('quantity', 0) != 0]
+        for pos in active_positions:
             base += abs(pos['quantity']) * units_per_contract * (price if kind == 'equity' else price * mult)
                 # Added filled position to base notional calculation
 
         # Include pending option trades (only if not already filled)
         if pending:
-            for item in pending:
-                if len(item) >= 2:
-                    opt_symbol, qty = item[0], item[1]
+            active_symbols = None
+            for opt_symbol, qty, _cached_delta in pending:
                 try:
                     if self._get_underlying_symbol(opt_symbol) != und_sym:
                         continue
@@ -1153,15 +1407,9 @@ class DeltaHedger:
                     continue
                 
                 # Check if this trade is already filled to avoid double-counting
-                already_filled = False
-                for pos in self.algorithm.positions.values():
-                    if (pos.get('quantity', 0) != 0 and 
-                        not pos.get('is_hedge', False) and 
-                        pos['symbol'] == opt_symbol):
-                        already_filled = True
-                        break
-                
-                if not already_filled:
+                if active_symbols is None:
+                    active_symbols = {p['symbol'] for p in active_positions}
+                if opt_symbol not in active_symbols:
                     contrib = abs(qty) * units_per_contract * (price if kind == 'equity' else price * mult)
                     base += contrib
                     # Added pending trade to base notional calculation
@@ -147,7 +147,7 @@ class ExitRulesManager:
                         self.algorithm.Debug(f"Close failed {retry_limit}x: removing non-tradable {symbol} from tracking")
                     # Remove from tracking since we can't close it after multiple attempts
                     if position_id in self.algorithm.positions:
-                        del self.algorithm.positions[position_id]
+                        self.algorithm.remove_position(position_id)
                     return
                 else:
                     if self.algorithm.debug_mode:
@@ -164,7 +164,7 @@ class ExitRulesManager:
             if abs(position['quantity']) < 1e-6:
                 if self.algorithm.debug_mode:
                     self.algorithm.Debug(f"Abort close: position {position_id} has zero quantity, removing from tracking")
-                del self.algorithm.positions[position_id]
+                self.algorithm.remove_position(position_id)
                 return
             
             # Calculate close quantity (opposite of current position)
@@ -180,7 +180,7 @@ class ExitRulesManager:
                 if qty == 0:
                     if self.algorithm.debug_mode:
                         self.algorithm.Debug(f"Abort close: rounded to zero quantity for {symbol}")
-                    del self.algorithm.positions[position_id]
+                    self.algorithm.remove_position(position_id)
                     return
 
                 # Get current quotes from security
@@ -292,7 +292,7 @@ class ExitRulesManager:
                 # Only delete if order failed to submit
                 if ticket.Status == OrderStatus.Invalid:
                     if position_id in self.algorithm.positions:
-                        del self.algorithm.positions[position_id]
+                        self.algorithm.remove_position(position_id)
 
             else:
                 self.algorithm.Debug(f"Position close failed for {symbol}: {ticket.Status}")
@@ -300,7 +300,7 @@ class ExitRulesManager:
         except Exception as e:
             self.algorithm.Debug(f"Error closing position {position_id}: {e}")
             # Still remove from tracking even if close failed
-            del self.algorithm.positions[position_id]
+            self.algorithm.remove_position(position_id)
 
     def should_roll_position(self, position, current_price):
         """
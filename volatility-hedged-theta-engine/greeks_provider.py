@@ -6,7 +6,7 @@ Consolidates OptionsDataManager functionality with additional fallbacks.
 """
 
 from AlgorithmImports import *  # noqa: F401
-from typing import Tuple, Optional
+from typing import List, Optional, Tuple
 
 
 class GreeksProvider:
@@ -14,20 +14,21 @@ class GreeksProvider:
         self.algorithm = algorithm
         self.iv_surface = iv_surface  # Optional placeholder for future model IV
 
-    def _qc_greeks(self, symbol) -> Tuple[Optional[float], Optional[float], Optional[float]]:
-        # Use centralized manager; no direct Security access here to keep single source of truth
+    def _qc_greek(self, getter: str, symbol) -> Optional[float]:
+        # Use centralized manager; no direct Security access here to keep single source of truth.
+        # Resolves only the requested Greek (get_delta/get_gamma/get_theta on OptionsDataManager).
         try:
-            if hasattr(self.algorithm, 'options_data') and self.algorithm.options_data is not None:
-                d, _ = self.algorithm.options_data.get_delta(symbol)
-                g, _ = self.algorithm.options_data.get_gamma(symbol)
-                t, _ = self.algorithm.options_data.get_theta(symbol)
-                return d, g, t
+            options_data = getattr(self.algorithm, 'options_data', None)
+            if options_data is not None:
+                value, _ = getattr(options_data, getter)(symbol)
+                return value
         except Exception:
-            return None, None, None
+            pass
+        return None
 
     def get_delta(self, symbol, strike: float, und_price: float, expiry) -> Tuple[float, str]:
         # 1) Try QC Greeks from Security
-        d, _, _ = self._qc_greeks(symbol)
+        d = self._qc_greek('get_delta', symbol)
         if d is not None:
             return d, "QC"
         # 2) Try cached QC Greeks from chain (same-day)
@@ -61,8 +62,26 @@ class GreeksProvider:
         fallback = -0.25 if is_put else 0.25
         return float(fallback), "FALLBACK"
 
+    def get_deltas(self, legs) -> List[float]:
+        # Batch form of get_delta for (symbol, strike, und_price, expiry) legs.
+        # The data manager is resolved once per batch; legs it cannot price take the full fallback chain.
+        options_data = getattr(self.algorithm, 'options_data', None)
+        qc_get_delta = getattr(options_data, 'get_delta', None)
+        deltas = []
+        for leg in legs:
+            d = None
+            if qc_get_delta is not None:
+                try:
+                    d, _ = qc_get_delta(leg[0])
+                except Exception:
+                    d = None
+            if d is None:
+                d, _ = self.get_delta(*leg)
+            deltas.append(d)
+        return deltas
+
     def get_gamma(self, symbol, strike: float, und_price: float, expiry) -> Tuple[float, str]:
-        _, g, _ = self._qc_greeks(symbol)
+        g = self._qc_greek('get_gamma', symbol)
         if g is not None:
             return g, "QC"
         try:
@@ -80,7 +99,7 @@ class GreeksProvider:
         return 0.0, "QC-NONE"
 
     def get_theta(self, symbol, strike: float, und_price: float, expiry, option_type: str = 'put') -> Tuple[float, str]:
-        _, _, t = self._qc_greeks(symbol)
+        t = self._qc_greek('get_theta', symbol)
         if t is not None:
             return t, "QC"
         try:
@@ -63,10 +63,9 @@ class IntradayRiskMonitor:
             
         try:
             current_time = self.algorithm.Time
-            current_time_only = current_time.time()
             
             # Only check during market hours (9:30 AM - 4:00 PM ET)
-            if not (9 <= current_time_only.hour <= 16):
+            if not (9 <= current_time.hour <= 16):
                 return
             
             # Check if enough time has passed since last risk check
@@ -231,9 +230,8 @@ class IntradayRiskMonitor:
             # Skip risk reduction during execution phases to avoid conflicts
             # Execution phases: P0 (15:45), P1 (15:50), P2 (15:55)
             # Stop risk reduction at 15:40 to avoid interfering with execution
-            current_time_only = current_time.time()
-            if (current_time_only.hour == 15 and current_time_only.minute >= 40) or \
-               (current_time_only.hour == 16 and current_time_only.minute == 0):
+            if (current_time.hour == 15 and current_time.minute >= 40) or \
+               (current_time.hour == 16 and current_time.minute == 0):
                 if self.algorithm.debug_mode:
                     self.algorithm.Debug(f"RISK REDUCTION SKIPPED: Execution phases in progress (Time={current_time.strftime('%H:%M:%S')})")
                 return  # Skip during execution phases
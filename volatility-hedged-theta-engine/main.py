@@ -9,7 +9,9 @@ from AlgorithmImports import *
 import numpy as np
 import os
 import json
+import gc
 from datetime import datetime, timedelta
+from collections import OrderedDict, defaultdict
 
 # Additional QuantConnect imports for better IDE support
 from QuantConnect.Algorithm import QCAlgorithm
@@ -47,7 +49,8 @@ from config import (
 
     # Performance optimization
     GREEKS_CACHE_CLEANUP_DAYS, POSITION_CLEANUP_DAYS, GREEKS_SNAPSHOT_INTERVAL_MINUTES,
-    DEBUG_LOGGING_ENABLED, MEMORY_MONITORING_ENABLED,
+    DEBUG_LOGGING_ENABLED, VERBOSE_FILL_LOGS, MEMORY_MONITORING_ENABLED, PROFILE_HEDGING,
+    MEMORY_PRESSURE_EVICTION_ENABLED, MEMORY_PRESSURE_CHECK_MINUTES, MANUAL_GC_ENABLED,
 
     # Intraday risk monitoring
     INTRADAY_RISK_MONITORING_ENABLED, RISK_CHECK_INTERVAL_MINUTES, MARGIN_CALL_THRESHOLD,
@@ -63,6 +66,7 @@ from config import (
     DELTA_TARGET_NAV_PCT_EQUITY, DELTA_TOL_NAV_PCT_EQUITY,
     DELTA_TARGET_NAV_PCT_FUTURE, DELTA_TOL_NAV_PCT_FUTURE,
     HEDGE_COOLDOWN_SECONDS, HEDGE_CLOSE_PROXIMITY_SECONDS,
+    MIN_REBALANCE_INTERVAL_SECONDS, REBALANCE_DELTA_EPSILON,
 
     # Black-Scholes
     BS_DEFAULT_ATM_IV, BS_DEFAULT_RISK_FREE_RATE,
@@ -194,12 +198,27 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
         # Basic configuration
         self.underlying_symbol = UNDERLYING_SYMBOL
         self.positions = {}
+        # Non-hedge positions keyed by underlying -> {pos_id: position}; maintained by add/remove_position
+        self.positions_by_underlying = defaultdict(dict)
+        # Hedge positions {pos_id: position}; the other ledger partition, also kept by add/remove_position
+        self.positions_hedge = {}
+        # All positions (options and hedges) keyed by symbol -> {pos_id: position} (insertion order kept)
+        self.positions_by_symbol = defaultdict(dict)
+        # Latest OnData option chain (+ SoA view) - set here so consumers can use `is not None`
+        self.current_chain = None
+        self.current_chain_soa = None
+        self._last_chain_count = 0
+        # Candidate-scan counters (PositionManager), created here instead of probed with hasattr per scan
+        self._no_candidates_streak = 0
+        self._missing_greeks_count = 0
+        # Mirror of Securities keys, built on first use and kept current by OnSecuritiesChanged
+        self._sec_symbol_set = None
         self.pending_exit_hedges = []  # Track exit orders that need delta hedging
         self.debug_mode = DEBUG_MODE
         # Cache recent implied volatilities per option symbol
         self.iv_cache = {}
-        # Cache recent QC Greeks per option symbol: {symbol: ((delta,gamma,theta), timestamp)}
-        self.greeks_cache = {}
+        # Cache recent QC Greeks per option symbol: {symbol: ((delta,gamma,theta), timestamp)} (LRU-ordered)
+        self.greeks_cache = OrderedDict()
 
         # Position management configuration
         self.min_buying_power = MIN_BUYING_POWER
@@ -227,7 +246,9 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
         self.greeks_cache_cleanup_days = GREEKS_CACHE_CLEANUP_DAYS
         self.position_cleanup_days = POSITION_CLEANUP_DAYS
         self.debug_logging_enabled = DEBUG_LOGGING_ENABLED
+        self.verbose_fill_logs = VERBOSE_FILL_LOGS
         self.memory_monitoring_enabled = MEMORY_MONITORING_ENABLED
+        self.profile_hedging = PROFILE_HEDGING
         
 
         # Option filtering configuration
@@ -275,6 +296,9 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
         # Delta hedging configuration
         self.delta_revert_mode = DELTA_REVERT_MODE
         self.delta_band_mode = DELTA_BAND_MODE
+        # Mode strings are fixed for the run; hedge passes branch on these flags
+        self.delta_revert_is_target = DELTA_REVERT_MODE.upper() == "TARGET"
+        self.delta_band_is_nav = DELTA_BAND_MODE.upper() == "NAV"
         self.delta_target_trade_pct_equity = DELTA_TARGET_TRADE_PCT_EQUITY
         self.delta_tol_trade_pct_equity = DELTA_TOL_TRADE_PCT_EQUITY
         self.delta_target_trade_pct_future = DELTA_TARGET_TRADE_PCT_FUTURE
@@ -288,6 +312,8 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
         self.last_hedge_time = None
         self.hedge_cooldown_seconds = HEDGE_COOLDOWN_SECONDS  # Configurable cooldown between hedges
         self.last_hedge_minute = None  # Track last hedge minute to prevent multiple per minute
+        self.min_rebalance_interval_s = MIN_REBALANCE_INTERVAL_SECONDS
+        self.rebalance_delta_epsilon = REBALANCE_DELTA_EPSILON
 
         # Position diversification configuration
         self.dte_buckets = DTE_BUCKETS
@@ -383,6 +409,10 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
         # Intraday hedging mode for market-order hedges
         self.intraday_hedging = True
 
+        # Schedule chain processing (execution bars) BEFORE the phase schedules
+        # so that at a shared time the chain is processed before ExecuteStrategy runs
+        self.data_processor.schedule_chain_processing()
+
         # Schedule Phase 0: Exits (15:45)
         if PHASE_SPLIT_ENABLED:
             self.Schedule.On(
@@ -412,6 +442,21 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
                 self.ExecuteStrategy
             )
 
+        # Schedule intraday risk monitoring every 5 minutes (the monitor applies its own interval throttle)
+        self.Schedule.On(
+            self.DateRules.EveryDay(self.underlying_symbol),
+            self.TimeRules.Every(timedelta(minutes=5)),
+            self._scheduled_risk_check
+        )
+
+        # Schedule memory-pressure check for Greeks/chain cache caps
+        if MEMORY_PRESSURE_EVICTION_ENABLED:
+            self.Schedule.On(
+                self.DateRules.EveryDay(self.underlying_symbol),
+                self.TimeRules.Every(timedelta(minutes=MEMORY_PRESSURE_CHECK_MINUTES)),
+                self.options_data.check_memory_pressure
+            )
+
         # Schedule cancel sweep for unfilled entry orders closer to market close
         if CANCEL_UNFILLED_AT_CLOSE:
             self.Schedule.On(
@@ -441,6 +486,11 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
             self.weekly_aggressive_cleanup
         )
 
+        # Manual GC: no automatic collections mid-phase; collect after each phase and after the close
+        self.manual_gc_enabled = MANUAL_GC_ENABLED
+        if self.manual_gc_enabled:
+            gc.disable()
+
         self.Log("Volatility Hedged Theta Engine initialized with modular architecture")
 
     def OnData(self, data):
@@ -451,10 +501,64 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
 
         # NOTE: Orchestrator logic removed - hedging now controlled by daily ExecuteStrategy flow
 
+    def OnSecuritiesChanged(self, changes):
+        """
+        Universe change handler - keeps the Securities key mirror current and
+        drops per-symbol hedger caches for added and removed securities so a
+        re-subscribed symbol picks up its current properties.
+
+        Removed securities stay in the mirror: LEAN keeps them in Securities, and a
+        contract still held after a universe removal must keep counting toward the hedge.
+        """
+        added, removed = changes.AddedSecurities, changes.RemovedSecurities
+        if self._sec_symbol_set is not None:
+            self._sec_symbol_set.update(security.Symbol for security in added)
+        for security in added:
+            self.delta_hedger.clear_symbol_cache(security.Symbol)
+        for security in removed:
+            self.delta_hedger.clear_symbol_cache(security.Symbol)
+
+    def security_symbols(self):
+        """
+        Python set mirroring Securities keys for cheap membership tests in hot loops.
+        """
+        if self._sec_symbol_set is None:
+            self._sec_symbol_set = set(self.Securities.Keys)
+        return self._sec_symbol_set
+
+    def chain_contract(self, symbol):
+        """
+        Contract for symbol in the latest option chain (None if absent), by keyed lookup.
+        """
+        chain = self.current_chain
+        if chain is None:
+            return None
+        contracts = getattr(chain, 'Contracts', None)
+        if contracts is not None:
+            return contracts[symbol] if contracts.ContainsKey(symbol) else None
+        return next((c for c in chain if c.Symbol == symbol), None)
+
+    def _scheduled_risk_check(self):
+        """
+        Scheduled intraday risk check.
+        Runs only while the underlying's market is open (TimeRules.Every fires all day),
+        and is skipped during execution phases (15:40-16:00) to avoid conflicts with P2 hedging.
+        """
+        current_time = self.Time
+        if current_time.hour > 15 or (current_time.hour == 15 and current_time.minute >= 40):
+            return
+        if not self.IsMarketOpen(self.underlying_symbol):
+            return
+        if self.intraday_risk_monitor:
+            self.intraday_risk_monitor.check_risk()
+
     def OnOrderEvent(self, order_event):
         """
         Order event handler - delegates to execution manager.
         """
+        if self.delta_hedger:
+            self.delta_hedger.invalidate_open_qty(order_event.Symbol)
+
         # Update position tracking on fills
         if order_event.Status == OrderStatus.Filled:
             try:
@@ -464,18 +568,15 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
 
                 # Find and update position - be specific about matching
                 updated = False
-                for pos_id, position in list(self.positions.items()):
-                    # Match on both symbol AND position type to avoid cross-contamination
-                    symbol_match = (position['symbol'] == symbol)
+                is_equity_order = (symbol.SecurityType == SecurityType.Equity)
+                is_option_order = (symbol.SecurityType == SecurityType.Option)
+                # Only positions on this symbol are candidates (symbol index, no full-ledger scan)
+                for pos_id, position in list(self.positions_by_symbol.get(symbol, {}).items()):
+                    # Match on position type too, to avoid cross-contamination
                     is_hedge_position = pos_id.startswith('hedge_')
-                    is_equity_order = (symbol.SecurityType == SecurityType.Equity)
-                    is_option_order = (symbol.SecurityType == SecurityType.Option)
 
                     # Hedge positions should only match equity orders, option positions should only match option orders
-                    if symbol_match and (
-                        (is_hedge_position and is_equity_order) or
-                        (not is_hedge_position and is_option_order)
-                    ):
+                    if (is_hedge_position and is_equity_order) or (not is_hedge_position and is_option_order):
                         current_qty = position['quantity']
 
                         # FIX: Detect zero crossing ONLY when the resulting position flips sign
@@ -503,12 +604,11 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
                         elif not is_hedge_position:
                             # Same-side add or partial reduction without crossing for options
                             if current_qty * fill_quantity > 0:
-                                # Same-side addition: update weighted average entry
-                                if total_quantity != 0:
-                                    position['entry_price'] = (
-                                        (position['entry_price'] * current_qty) +
-                                        (fill_price * fill_quantity)
-                                    ) / total_quantity
+                                # Same-side addition: update weighted average entry (total is non-zero here)
+                                position['entry_price'] = (
+                                    (position['entry_price'] * current_qty) +
+                                    (fill_price * fill_quantity)
+                                ) / total_quantity
                             # For partial reduction without crossing, keep entry price unchanged
 
                         if symbol.SecurityType == SecurityType.Option and fill_quantity < 0:
@@ -516,24 +616,25 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
                             credit = fill_price * abs(fill_quantity) * 100
                             position['credit_received'] = position.get('credit_received', 0) + credit
 
-                        # Only show entry price for options, not hedges
-                        if is_hedge_position:
-                            self.Log(f"POSITION FILLED: {pos_id} | Quantity: {position['quantity']} | "
-                                     f"Credit: ${position.get('credit_received', 0):.0f}")
-                        else:
-                            self.Log(f"POSITION FILLED: {pos_id} | Quantity: {position['quantity']} | "
-                                     f"Entry: ${position['entry_price']:.2f} | "
-                                     f"Credit: ${position.get('credit_received', 0):.0f}")
-
-                        if abs(position['quantity']) < 1e-6:
+                        # Only show entry price for options, not hedges (message built only when logged)
+                        if self.verbose_fill_logs:
+                            if is_hedge_position:
+                                self.Log(f"POSITION FILLED: {pos_id} | Quantity: {position['quantity']} | "
+                                         f"Credit: ${position.get('credit_received', 0):.0f}")
+                            else:
+                                self.Log(f"POSITION FILLED: {pos_id} | Quantity: {position['quantity']} | "
+                                         f"Entry: ${position['entry_price']:.2f} | "
+                                         f"Credit: ${position.get('credit_received', 0):.0f}")
+
+                        # Quantities are sums of whole-unit fills, so flat is exactly zero
+                        if total_quantity == 0:
                             if self.debug_mode:
                                 self.Debug(f"POSITION CLOSED: Removing {pos_id}")
                             # Guard against concurrent deletion
                             if pos_id in self.positions:
-                                del self.positions[pos_id]
+                                self.remove_position(pos_id)
 
                         if self.debug_mode:
-                            total_quantity = current_qty + fill_quantity
                             self.Debug(f"POSITION: {symbol} qty {current_qty} -> {total_quantity} ({'hedge' if is_hedge_position else 'option'})")
                         updated = True
                         break
@@ -543,19 +644,20 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
                 if not updated and abs(fill_quantity) > 0 and symbol.SecurityType == SecurityType.Equity:
                     # Use order tag to create unique hedge position ID for per-trade hedging
                     order_tag = order_event.OrderId  # Get the order tag from the order event
+                    stamp = self.Time.strftime('%Y%m%d_%H%M%S')
                     if hasattr(order_event, 'Order') and hasattr(order_event.Order, 'Tag') and order_event.Order.Tag:
                         tag_parts = order_event.Order.Tag.split('_')
                         if len(tag_parts) >= 2 and tag_parts[0] == 'HEDGE':
                             # Extract option symbol from tag for unique hedge position ID
                             option_symbol_part = '_'.join(tag_parts[1:])  # Everything after 'HEDGE_'
-                            hedge_id = f"hedge_{symbol}_{option_symbol_part}_{self.Time.strftime('%Y%m%d_%H%M%S')}"
+                            hedge_id = f"hedge_{symbol}_{option_symbol_part}_{stamp}"
                         else:
                             # Fallback to original logic for non-per-trade hedges
-                            hedge_id = f"hedge_{symbol}_{self.Time.strftime('%Y%m%d_%H%M%S')}"
+                            hedge_id = f"hedge_{symbol}_{stamp}"
                     else:
                         # Fallback to original logic if no tag available
-                        hedge_id = f"hedge_{symbol}_{self.Time.strftime('%Y%m%d_%H%M%S')}"
-                    self.positions[hedge_id] = {
+                        hedge_id = f"hedge_{symbol}_{stamp}"
+                    self.add_position(hedge_id, {
                         'symbol': symbol,
                         'quantity': fill_quantity,
                         'entry_price': 0.0,  # Not used for hedges, but needed for compatibility
@@ -565,7 +667,7 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
                         'timestamp': self.Time,
                         'target_contracts': None,
                         'is_hedge': True
-                    }
+                    })
                     if self.debug_mode:
                         self.Debug(f"Tracked hedge fill: {hedge_id} | Qty: {fill_quantity} | Price: ${fill_price:.2f}")
 
@@ -598,12 +700,10 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
             # Check if we have current option chain data for this symbol
             option_chain_bid = None
             option_chain_ask = None
-            if hasattr(self, 'current_chain') and self.current_chain:
-                for contract in self.current_chain:
-                    if contract.Symbol == symbol:
-                        option_chain_bid = contract.BidPrice if contract.BidPrice and contract.BidPrice > 0 else None
-                        option_chain_ask = contract.AskPrice if contract.AskPrice and contract.AskPrice > 0 else None
-                        break
+            contract = self.chain_contract(symbol)
+            if contract is not None:
+                option_chain_bid = contract.BidPrice if contract.BidPrice and contract.BidPrice > 0 else None
+                option_chain_ask = contract.AskPrice if contract.AskPrice and contract.AskPrice > 0 else None
             
             # Log option chain data if available
             if option_chain_bid and option_chain_ask:
@@ -698,7 +798,7 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
         if not PHASE_SPLIT_ENABLED:
             return True, True, True  # Run all phases if split is disabled
 
-        current_time = self.Time.time()
+        current_time = self.Time
         phase_0_time = datetime.strptime(PHASE_0_TIME, "%H:%M").time()
         phase_1_time = datetime.strptime(PHASE_1_TIME, "%H:%M").time()
         phase_2_time = datetime.strptime(PHASE_2_TIME, "%H:%M").time()
@@ -761,11 +861,54 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
                 if self.debug_mode:
                     current_time_str = self.Time.strftime("%H:%M:%S")
                     self.Debug(f"EXECUTION SKIPPED: Outside execution windows (Time={current_time_str})")
+            elif self.manual_gc_enabled:
+                # Young-generation sweep between phases (full collection runs after the close)
+                gc.collect(0)
 
         except Exception as e:
             if self.debug_mode:
                 self.Debug(f"ExecuteStrategy error: {e}")
 
+    def add_position(self, pos_id, position):
+        """
+        Store a position, index it by symbol and in the hedge or by-underlying partition.
+        """
+        self.positions[pos_id] = position
+        symbol = position.get('symbol')
+        if symbol is not None:
+            self.positions_by_symbol[symbol][pos_id] = position
+        if position.get('is_hedge', False):
+            self.positions_hedge[pos_id] = position
+            return
+        if symbol is not None:
+            und_sym = self.delta_hedger._get_underlying_symbol(symbol)
+            self.positions_by_underlying[und_sym][pos_id] = position
+
+    def remove_position(self, pos_id):
+        """
+        Remove a position from the ledger, the symbol index and its partition.
+        """
+        position = self.positions.pop(pos_id, None)
+        if position is None:
+            return
+        symbol = position.get('symbol')
+        if symbol is not None:
+            bucket = self.positions_by_symbol.get(symbol)
+            if bucket is not None:
+                bucket.pop(pos_id, None)
+                if not bucket:
+                    del self.positions_by_symbol[symbol]
+        if position.get('is_hedge', False):
+            self.positions_hedge.pop(pos_id, None)
+            return
+        if symbol is not None:
+            und_sym = self.delta_hedger._get_underlying_symbol(symbol)
+            bucket = self.positions_by_underlying.get(und_sym)
+            if bucket is not None:
+                bucket.pop(pos_id, None)
+                if not bucket:
+                    del self.positions_by_underlying[und_sym]
+
     def cleanup_old_positions(self):
         """Aggressive cleanup of old positions to prevent memory bloat"""
         try:
@@ -804,7 +947,7 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
                         old_positions.append(pos_id)
             
             for pos_id in old_positions:
-                del self.positions[pos_id]
+                self.remove_position(pos_id)
             
             if old_positions:
                 self.debug_log(f"POSITION CLEANUP: Removed {len(old_positions)} positions (dict size: {len(self.positions)})")
@@ -869,6 +1012,11 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
             # Log memory usage if monitoring enabled
             self.log_memory_usage()
             
+            # Full collection after the close (automatic GC is disabled when manual GC is enabled)
+            if self.manual_gc_enabled:
+                unreachable = gc.collect()
+                self.debug_log(f"GC: Full collection freed {unreachable} unreachable objects")
+            
             self.debug_log("=== DAILY CLEANUP COMPLETE ===")
                 
         except Exception as e:
@@ -900,13 +1048,12 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
                     old_positions.append(pos_id)
             
             for pos_id in old_positions:
-                del self.positions[pos_id]
+                self.remove_position(pos_id)
             
             if old_positions:
                 self.debug_log(f"WEEKLY CLEANUP: Removed {len(old_positions)} old positions")
             
             # Force garbage collection
-            import gc
             gc.collect()
             
             self.debug_log("=== WEEKLY AGGRESSIVE CLEANUP COMPLETE ===")
@@ -948,19 +1095,21 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
         This prevents orders from rolling into next-day market-on-open fills.
         """
         try:
-            # Get ALL open orders (not just for option symbol - specific contracts have different symbols)
-            all_open_orders = self.Transactions.GetOpenOrders()
-
-            cancelled = 0
-            for order in all_open_orders:
-                # Cancel ALL ENTRY orders that are still open or partially filled, regardless of age/symbol
-                if (getattr(order, "Tag", "") == ENTRY_TAG and
-                    order.Status in [OrderStatus.Submitted, OrderStatus.PartiallyFilled]):
-                    self.Transactions.CancelOrder(order.Id, "Cancel unfilled entry before close")
-                    cancelled += 1
-
-            if cancelled > 0 and self.debug_mode:
-                self.Debug(f"Canceled {cancelled} unfilled ENTRY order(s) before close")
+            # Get ALL open orders in one query (not just for option symbol - specific contracts have different symbols)
+            transactions = self.Transactions
+            all_open_orders = transactions.GetOpenOrders()
+            open_statuses = (OrderStatus.Submitted, OrderStatus.PartiallyFilled)
+
+            # Select ALL ENTRY orders that are still open or partially filled, regardless of age/symbol,
+            # then cancel them in one pass (each cancel raises its own order event)
+            stale_ids = [order.Id for order in all_open_orders
+                         if getattr(order, "Tag", "") == ENTRY_TAG and order.Status in open_statuses]
+            cancel = transactions.CancelOrder
+            for order_id in stale_ids:
+                cancel(order_id, "Cancel unfilled entry before close")
+
+            if stale_ids and self.debug_mode:
+                self.Debug(f"Canceled {len(stale_ids)} unfilled ENTRY order(s) before close")
 
         except Exception as e:
             if self.debug_mode:
@@ -1217,7 +1366,7 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
                     candidate = intent.candidate
                     symbol = candidate.get('symbol')
                     target_qty = candidate.get('target_contracts', 0)
-                    cached_delta = candidate.get('delta', 0.0)
+                    cached_delta = candidate.get('delta') or 0.0
                     if symbol and target_qty != 0:
                         pending_list.append((symbol, target_qty, cached_delta))
 
@@ -1243,17 +1392,13 @@ class DeltaHedgedThetaEngine(QCAlgorithm):
                 self.Debug(f"EXIT HEDGE: Processing {symbol} qty={qty} reason={reason}")
             
             # Get option contract details
-            if not hasattr(self, 'current_chain') or not self.current_chain:
+            if self.current_chain is None:
                 if self.debug_mode:
                     self.Debug(f"EXIT HEDGE: No chain data available")
                 return
             
             # Find the option contract in the chain
-            option_contract = None
-            for contract in self.current_chain:
-                if contract.Symbol == symbol:
-                    option_contract = contract
-                    break
+            option_contract = self.chain_contract(symbol)
             
             if option_contract is None:
                 if self.debug_mode:
@@ -104,26 +104,23 @@ RESULT: Massive performance degradation, slow backtests, excessive memory usage
 THROTTLING SOLUTION:
 
 1. Standard Throttling (15-minute intervals):
-   - Snapshot updated every 15 minutes during regular trading
-   - Reduces chain processing from 390/day to ~26/day (93% reduction)
-   - Annual reduction: 98,280 → 6,552 updates/year (93% reduction)
-   - 5-year reduction: 491,400 → 32,760 updates (93% reduction)
+   - update_chain() only runs at DataProcessor's scheduled execution bars
+     (15:45, 15:50, 15:55, 15:59, 16:00), i.e. 5 calls/day instead of 390
+   - Within those, 15:50 and 15:55 fall inside 15 minutes of the 15:45 snapshot and
+     are skipped, so only 15:45 (plus the EOD bars below) rebuild the snapshot
 
 2. EOD Exception (15:59 or 16:00):
    - ALWAYS updates at 15:59/16:00 regardless of throttling
    - Ensures fresh Greeks for EOD reporting
    - Prevents using stale 4-bar-old data at market close
 
-3. Fill Data Refresh (after execution phases):
-   - Updates at 15:46, 15:51, 15:56 (one bar after each execution phase)
-   - Ensures fresh data for force-filled orders
-   - Minimal overhead (3 extra updates per day)
-
 CONFIGURATION:
 - Throttling interval: config.GREEKS_SNAPSHOT_INTERVAL_MINUTES (default: 15)
 - Cache cleanup: config.GREEKS_CACHE_CLEANUP_DAYS (default: 7)
 - Max cache size: config.GREEKS_CACHE_MAX_ENTRIES (default: 200)
 - Max snapshot size: config.CHAIN_SNAPSHOT_MAX_ENTRIES (default: 100)
+- Memory pressure: caps halve above config.MEMORY_HIGH_WATER_BYTES RSS and
+  restore below config.MEMORY_LOW_WATER_BYTES (check_memory_pressure)
 
 =============================================================================
 USAGE PATTERNS
@@ -164,7 +161,7 @@ Additional complexity in data architecture
 
 Mitigations:
 EOD exception ensures fresh data for critical reporting
-Fill data refresh ensures fresh data after order fills
+Fills price from Securities quotes, which QC updates every bar
 Execution phases still get real-time data (15:45, 15:50, 15:55, 15:59)
 Source labels clearly indicate data age for debugging
 
@@ -173,13 +170,45 @@ Source labels clearly indicate data age for debugging
 
 from AlgorithmImports import *  # noqa: F401
 from typing import Optional, Tuple, Dict
+from collections import OrderedDict
+import os
+from config import (
+    GREEKS_CACHE_MAX_ENTRIES, CHAIN_SNAPSHOT_MAX_ENTRIES,
+    MEMORY_PRESSURE_EVICTION_ENABLED, MEMORY_HIGH_WATER_BYTES, MEMORY_LOW_WATER_BYTES,
+    CACHE_MIN_ENTRIES_UNDER_PRESSURE
+)
+
+try:
+    import psutil  # Optional: not available on every LEAN image
+except ImportError:
+    psutil = None
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process in bytes, or None if it cannot be read."""
+    if psutil is not None:
+        try:
+            return int(psutil.Process(os.getpid()).memory_info().rss)
+        except Exception:
+            pass
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        return None
 
 
 class OptionsDataManager:
     def __init__(self, algorithm):
         self.algorithm = algorithm
-        # Per-bar snapshot: { Symbol: (delta, gamma, theta, vega) }
-        self.chain_greeks_snapshot: Dict[Symbol, Tuple[Optional[float], Optional[float], Optional[float], Optional[float]]] = {}
+        # Per-bar snapshot: { Symbol: (delta, gamma, theta, vega) } (insertion-ordered for O(1) eviction)
+        self.chain_greeks_snapshot: Dict[Symbol, Tuple[Optional[float], Optional[float], Optional[float], Optional[float]]] = OrderedDict()
+
+        # Cache caps (LRU eviction via OrderedDict.popitem(last=False))
+        # Config values are hard limits; effective caps shrink under memory pressure
+        self.greeks_cache_max_entries = GREEKS_CACHE_MAX_ENTRIES
+        self.chain_snapshot_max_entries = CHAIN_SNAPSHOT_MAX_ENTRIES
 
         # Snapshot throttling (minutes)
         try:
@@ -189,12 +218,20 @@ class OptionsDataManager:
         self._last_snapshot_time = None
 
         # Use algorithm.greeks_cache for continuity with existing logging/EOD
-        if not hasattr(self.algorithm, 'greeks_cache'):
-            self.algorithm.greeks_cache = {}
+        if not isinstance(getattr(self.algorithm, 'greeks_cache', None), OrderedDict):
+            self.algorithm.greeks_cache = OrderedDict(getattr(self.algorithm, 'greeks_cache', {}))
+
+    def cache_greeks(self, symbol, greeks, time) -> None:
+        """Insert/refresh greeks_cache entry as most-recently-used; evict LRU entries beyond the cap in O(1)."""
+        cache = self.algorithm.greeks_cache
+        if symbol in cache:
+            cache.move_to_end(symbol)
+        cache[symbol] = (greeks, time)
+        while len(cache) > self.greeks_cache_max_entries:
+            cache.popitem(last=False)
 
     def update_chain(self, chain) -> None:
         """Build snapshot only for active option symbols at configured interval; seed same-day cache."""
-        snapshot: Dict[Symbol, Tuple[Optional[float], Optional[float], Optional[float], Optional[float]]] = {}
         time = getattr(self.algorithm, 'Time', None)
 
         # Check if this is EOD time (15:59 or 16:00) - always refresh for accurate EOD Greeks
@@ -236,8 +273,10 @@ class OptionsDataManager:
         except Exception:
             active_symbols = set()
 
+        # Rebuild in place: the snapshot dict is reused across bars instead of reallocated
+        snapshot = self.chain_greeks_snapshot
+        snapshot.clear()
         if not active_symbols:
-            self.chain_greeks_snapshot = {}
             return
 
         for contract in chain:
@@ -253,14 +292,15 @@ class OptionsDataManager:
                 t = float(cg.Theta) if cg.Theta is not None else None
                 v = float(cg.Vega) if hasattr(cg, 'Vega') and cg.Vega is not None else None
                 snapshot[sym] = (d, g, t, v)
+                if len(snapshot) > self.chain_snapshot_max_entries:
+                    snapshot.popitem(last=False)
                 # Seed same-day cache
                 try:
-                    self.algorithm.greeks_cache[sym] = ((d, g, t, v), time)
+                    self.cache_greeks(sym, (d, g, t, v), time)
                 except Exception:
                     pass
             except Exception:
                 continue
-        self.chain_greeks_snapshot = snapshot
         self._last_snapshot_time = time
 
     def seed_active_positions(self) -> None:
@@ -280,14 +320,14 @@ class OptionsDataManager:
                 d = float(greeks.Delta)
                 g = float(greeks.Gamma) if greeks.Gamma is not None else None
                 t = float(greeks.Theta) if greeks.Theta is not None else None
-                self.algorithm.greeks_cache[sym] = ((d, g, t), self.algorithm.Time)
+                self.cache_greeks(sym, (d, g, t), self.algorithm.Time)
                 continue
 
             # Otherwise seed from chain snapshot
             snap = self.chain_greeks_snapshot.get(sym)
             if snap is not None:
                 try:
-                    self.algorithm.greeks_cache[sym] = (snap, self.algorithm.Time)
+                    self.cache_greeks(sym, snap, self.algorithm.Time)
                 except Exception:
                     pass
 
@@ -312,9 +352,12 @@ class OptionsDataManager:
         return snap
 
     def _from_cache(self, symbol) -> Tuple[Optional[float], Optional[float], Optional[float], Optional[float], str]:
-        cached = getattr(self.algorithm, 'greeks_cache', {}).get(symbol, None)
+        cache = getattr(self.algorithm, 'greeks_cache', {})
+        cached = cache.get(symbol, None)
         if not cached:
             return None, None, None, None, "QC-NONE"
+        if isinstance(cache, OrderedDict):
+            cache.move_to_end(symbol)  # Mark as recently used
         if len(cached[0]) >= 4:  # Check if vega is available in cache
             (d, g, t, v), ts = cached
         else:  # Fallback for old cache format
@@ -385,37 +428,32 @@ class OptionsDataManager:
             
             # Clean up algorithm.greeks_cache
             if hasattr(self.algorithm, 'greeks_cache'):
-                old_keys = []
-                for symbol, (greeks, timestamp) in self.algorithm.greeks_cache.items():
-                    if timestamp and hasattr(timestamp, 'date') and timestamp.date() < cutoff_date:
-                        old_keys.append(symbol)
+                # Entries without a usable timestamp are kept
+                cache = self.algorithm.greeks_cache
+                old_keys = [symbol for symbol, (_greeks, timestamp) in cache.items()
+                            if timestamp and hasattr(timestamp, 'date') and timestamp.date() < cutoff_date]
                 
                 for key in old_keys:
-                    del self.algorithm.greeks_cache[key]
+                    del cache[key]
                 
                 if old_keys:
                     self.algorithm.debug_log(f"GREEKS CLEANUP: Removed {len(old_keys)} old entries")
 
-                # Enforce hard cap on greeks_cache size - AGGRESSIVE LIMIT
-                try:
-                    max_entries = int(getattr(self.algorithm, 'greeks_cache_max_entries', getattr(self.algorithm, 'GREEKS_CACHE_MAX_ENTRIES', 200)))  # Reduced from 2000 to 200
-                except Exception:
-                    max_entries = 200
+                # Enforce hard cap on greeks_cache size - AGGRESSIVE LIMIT (LRU order, O(1) per eviction)
+                max_entries = self.greeks_cache_max_entries
                 if len(self.algorithm.greeks_cache) > max_entries:
-                    # Drop oldest by timestamp first
-                    items = list(self.algorithm.greeks_cache.items())
-                    items.sort(key=lambda kv: kv[1][1] or self.algorithm.Time)
                     to_prune = len(self.algorithm.greeks_cache) - max_entries
-                    for i in range(to_prune):
-                        del self.algorithm.greeks_cache[items[i][0]]
+                    for _ in range(to_prune):
+                        self.algorithm.greeks_cache.popitem(last=False)
                     self.algorithm.debug_log(f"GREEKS CLEANUP: Pruned {to_prune} entries to cap {max_entries}")
             
             # Clean up chain snapshot (keep only recent)
             if hasattr(self, 'chain_greeks_snapshot'):
                 old_chain_keys = []
+                current_chain = self.algorithm.current_chain
                 for symbol in self.chain_greeks_snapshot.keys():
                     # Remove symbols that are no longer in current chain
-                    if not any(contract.Symbol == symbol for contract in getattr(self.algorithm, 'current_chain', [])):
+                    if current_chain is None or not any(contract.Symbol == symbol for contract in current_chain):
                         old_chain_keys.append(symbol)
                 
                 for key in old_chain_keys:
@@ -424,17 +462,12 @@ class OptionsDataManager:
                 if old_chain_keys:
                     self.algorithm.debug_log(f"CHAIN CLEANUP: Removed {len(old_chain_keys)} old chain entries")
 
-                # Enforce AGGRESSIVE hard cap on chain snapshot size
-                try:
-                    max_chain = int(getattr(self.algorithm, 'chain_snapshot_max_entries', getattr(self.algorithm, 'CHAIN_SNAPSHOT_MAX_ENTRIES', 100)))  # Reduced from 500 to 100
-                except Exception:
-                    max_chain = 100
+                # Enforce AGGRESSIVE hard cap on chain snapshot size (oldest by insertion order)
+                max_chain = self.chain_snapshot_max_entries
                 if len(self.chain_greeks_snapshot) > max_chain:
-                    # No timestamps here; drop arbitrary oldest by insertion order if dict preserves it, else slice
-                    keys = list(self.chain_greeks_snapshot.keys())
                     to_prune = len(self.chain_greeks_snapshot) - max_chain
-                    for k in keys[:to_prune]:
-                        del self.chain_greeks_snapshot[k]
+                    for _ in range(to_prune):
+                        self.chain_greeks_snapshot.popitem(last=False)
                     self.algorithm.debug_log(f"CHAIN CLEANUP: Pruned {to_prune} entries to cap {max_chain}")
                 
                 # EMERGENCY CLEANUP: If still too large, clear entire snapshot
@@ -445,6 +478,40 @@ class OptionsDataManager:
         except Exception as e:
             self.algorithm.debug_log(f"Greeks cleanup error: {e}")
 
+    def check_memory_pressure(self) -> None:
+        """
+        Adjust cache caps from process RSS (scheduled, see main.Initialize).
+
+        Above MEMORY_HIGH_WATER_BYTES: halve the effective caps (floored) and evict LRU entries.
+        Below MEMORY_LOW_WATER_BYTES: restore the caps to the configured hard limits.
+        Between the marks caps are left as-is (hysteresis avoids flapping).
+        """
+        if not MEMORY_PRESSURE_EVICTION_ENABLED:
+            return
+        rss = _current_rss_bytes()
+        if rss is None:
+            return
+
+        if rss > MEMORY_HIGH_WATER_BYTES:
+            self.greeks_cache_max_entries = max(CACHE_MIN_ENTRIES_UNDER_PRESSURE, self.greeks_cache_max_entries // 2)
+            self.chain_snapshot_max_entries = max(CACHE_MIN_ENTRIES_UNDER_PRESSURE, self.chain_snapshot_max_entries // 2)
+
+            cache = self.algorithm.greeks_cache
+            evicted = 0
+            while len(cache) > self.greeks_cache_max_entries:
+                cache.popitem(last=False)
+                evicted += 1
+            while len(self.chain_greeks_snapshot) > self.chain_snapshot_max_entries:
+                self.chain_greeks_snapshot.popitem(last=False)
+                evicted += 1
+
+            self.algorithm.debug_log(f"MEMORY PRESSURE: RSS {rss / 1048576:.0f}MB > high water, "
+                                     f"caps Greeks={self.greeks_cache_max_entries} Chain={self.chain_snapshot_max_entries}, "
+                                     f"evicted {evicted} entries")
+        elif rss < MEMORY_LOW_WATER_BYTES:
+            self.greeks_cache_max_entries = GREEKS_CACHE_MAX_ENTRIES
+            self.chain_snapshot_max_entries = CHAIN_SNAPSHOT_MAX_ENTRIES
+
     def get_cache_age_minutes(self, symbol) -> Optional[int]:
         """Return age in minutes for cached greeks for symbol, if available."""
         try:
@@ -76,12 +76,10 @@ class OrderEventHandler:
             # Check if we have current option chain data for this symbol
             option_chain_bid = None
             option_chain_ask = None
-            if hasattr(self.algorithm, 'current_chain') and self.algorithm.current_chain:
-                for contract in self.algorithm.current_chain:
-                    if contract.Symbol == symbol:
-                        option_chain_bid = contract.BidPrice if contract.BidPrice and contract.BidPrice > 0 else None
-                        option_chain_ask = contract.AskPrice if contract.AskPrice and contract.AskPrice > 0 else None
-                        break
+            contract = self.algorithm.chain_contract(symbol)
+            if contract is not None:
+                option_chain_bid = contract.BidPrice if contract.BidPrice and contract.BidPrice > 0 else None
+                option_chain_ask = contract.AskPrice if contract.AskPrice and contract.AskPrice > 0 else None
             
             # Log option chain data if available
             if option_chain_bid and option_chain_ask:
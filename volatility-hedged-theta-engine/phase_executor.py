@@ -111,9 +111,7 @@ class PhaseExecutor:
         """
         new_trade_intents = []
         
-        if (hasattr(self.algorithm, 'current_chain') and 
-            self.algorithm.current_chain is not None and 
-            self.algorithm.strategy):
+        if self.algorithm.current_chain is not None and self.algorithm.strategy:
             
             ctx = StrategyContext(
                 algorithm=self.algorithm,
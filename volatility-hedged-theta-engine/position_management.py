@@ -8,6 +8,7 @@ and managing position entries with diversification controls.
 from AlgorithmImports import *
 from typing import List, Dict, Optional, Tuple
 import math
+import numpy as np
 from config import (
     # Margin estimation parameters
     MARGIN_ESTIMATE_1_UNDERLYING_PCT, MARGIN_ESTIMATE_2_UNDERLYING_PCT, MARGIN_MINIMUM_FLOOR,
@@ -123,8 +124,6 @@ class PositionManager:
         
         # If still no candidates found, track for aggressive adaptation
         if len(fallback_candidates) == 0:
-            if not hasattr(self.algorithm, '_no_candidates_streak'):
-                self.algorithm._no_candidates_streak = 0
             self.algorithm._no_candidates_streak += 1
             
             # After N consecutive days with no candidates, aggressively relax filters
@@ -153,12 +152,20 @@ class PositionManager:
         - Pricing: Securities data when available (consistent), fallback to chain data
         - Purpose: Eliminate race conditions in filtering while maintaining discovery completeness
         """
+        algo = self.algorithm
         candidates = []
 
         try:
-            underlying_price = self.algorithm.Securities[self.algorithm.underlying_symbol].Price
-            if self.algorithm.debug_mode:
-                self.algorithm.Debug(f"Finding options: Price=${underlying_price:.2f}, DTE={self.algorithm.min_target_dte}-{self.algorithm.max_target_dte}")
+            underlying_price = algo.Securities[algo.underlying_symbol].Price
+            if algo.debug_mode:
+                algo.Debug(f"Finding options: Price=${underlying_price:.2f}, DTE={algo.min_target_dte}-{algo.max_target_dte}")
+
+            # Scan-invariant lookups, resolved once instead of per contract
+            current_date = algo.Time.date() if hasattr(algo.Time, 'date') else algo.Time
+            options_data = algo.options_data
+            greeks_provider = algo.greeks_provider
+            securities = algo.Securities
+            debug = algo.debug_mode
 
             # FILTERING ONLY: Use OnData chain for discovery (full option universe)
             # Securities data used only for consistent pricing during filtering
@@ -169,15 +176,37 @@ class PositionManager:
             premium_filtered = 0
             spread_filtered = 0
             
+            # Vectorized prefilter on the chain's structure-of-arrays snapshot (put + DTE window)
+            # so only surviving contracts reach the per-contract Python path below
+            contracts_to_scan = option_chain
+            chain_quotes = None
+            soa = algo.current_chain_soa
+            if soa is not None and soa.chain is option_chain:
+                today_ord = algo.Time.date().toordinal()
+                dtes = soa.expiry_ord - today_ord
+                in_dte = (dtes >= algo.min_target_dte) & (dtes <= algo.max_target_dte)
+                total_contracts = len(soa.contracts)
+                puts_found = int(np.count_nonzero(soa.is_put))
+                dte_filtered = int(np.count_nonzero(soa.is_put & ~in_dte))
+                contracts = soa.contracts
+                scan_idx = np.flatnonzero(soa.is_put & in_dte)
+                contracts_to_scan = [contracts[i] for i in scan_idx]
+                # Chain quotes for the survivors come from the snapshot arrays (no per-contract bridge reads)
+                chain_quotes = list(zip(soa.bids[scan_idx].tolist(), soa.asks[scan_idx].tolist()))
+                prefiltered = True
+            else:
+                prefiltered = False
+
             # Iterate through OnData chain for full option discovery
-            for contract in option_chain:
-                total_contracts += 1
+            for k, contract in enumerate(contracts_to_scan):
                 symbol = contract.Symbol
 
-                # Basic filters
-                if contract.Right != OptionRight.Put:
-                    continue
-                puts_found += 1
+                if not prefiltered:
+                    total_contracts += 1
+                    # Basic filters
+                    if contract.Right != OptionRight.Put:
+                        continue
+                    puts_found += 1
 
                 # FILTERING ONLY: Use OnData chain data FIRST (most fresh), fallback to Securities
                 # NOTE: This pricing is ONLY for filtering - execution uses fresh OnData data
@@ -185,13 +214,17 @@ class PositionManager:
                 ask_price = None
                 
                 # Try OnData chain data FIRST (freshest source during execution phases)
-                if contract.BidPrice > 0 and contract.AskPrice > 0:
-                    bid_price = contract.BidPrice
-                    ask_price = contract.AskPrice
+                if chain_quotes is not None:
+                    chain_bid, chain_ask = chain_quotes[k]
+                else:
+                    chain_bid, chain_ask = contract.BidPrice, contract.AskPrice
+                if chain_bid > 0 and chain_ask > 0:
+                    bid_price = chain_bid
+                    ask_price = chain_ask
                 
                 # Fallback to Securities data if OnData not available
-                if (bid_price is None or ask_price is None) and symbol in self.algorithm.Securities:
-                    security = self.algorithm.Securities[symbol]
+                if (bid_price is None or ask_price is None) and symbol in securities:
+                    security = securities[symbol]
                     if security.BidPrice > 0 and security.AskPrice > 0:
                         bid_price = security.BidPrice
                         ask_price = security.AskPrice
@@ -203,16 +236,11 @@ class PositionManager:
                     else:
                         expiry_date = contract.Expiry
                     
-                    if hasattr(self.algorithm.Time, 'date'):
-                        current_date = self.algorithm.Time.date()
-                    else:
-                        current_date = self.algorithm.Time
-                    
                     dte = (expiry_date - current_date).days
                 except Exception as e:
                     # Skip contract with DTE calculation error
                     continue
-                if not (self.algorithm.min_target_dte <= dte <= self.algorithm.max_target_dte):
+                if not (algo.min_target_dte <= dte <= algo.max_target_dte):
                     dte_filtered += 1
                     continue
 
@@ -223,7 +251,7 @@ class PositionManager:
 
                 premium = (bid_price + ask_price) / 2
                 # Use percentage-based premium filter relative to underlying price
-                min_premium_required = underlying_price * self.algorithm.min_premium_pct_of_spot
+                min_premium_required = underlying_price * algo.min_premium_pct_of_spot
                 if premium < min_premium_required:
                     premium_filtered += 1
                     continue
@@ -232,15 +260,15 @@ class PositionManager:
                 mid_price = (bid_price + ask_price) / 2
                 spread_abs = abs(ask_price - bid_price)
                 spread_pct = spread_abs / mid_price if mid_price > 0 else 1.0
-                max_allowed_spread = max(self.algorithm.entry_max_spread_pct * mid_price,
+                max_allowed_spread = max(algo.entry_max_spread_pct * mid_price,
                                          getattr(self.algorithm, 'entry_abs_spread_min', 0.0))
                 if spread_abs > max_allowed_spread:
                     spread_filtered += 1
                     continue
 
                 # CRITICAL FIX: Check if contract is tradable
-                if symbol in self.algorithm.Securities:
-                    security = self.algorithm.Securities[symbol]
+                if symbol in securities:
+                    security = securities[symbol]
                     if not security.IsTradable:
                         # Skip non-tradable contract
                         continue
@@ -259,15 +287,13 @@ class PositionManager:
                         gamma = float(contract.Greeks.Gamma) if contract.Greeks.Gamma is not None else None
                         theta = float(contract.Greeks.Theta) if contract.Greeks.Theta is not None else None
                         vega = float(contract.Greeks.Vega) if hasattr(contract.Greeks, 'Vega') and contract.Greeks.Vega is not None else None
-                        if not hasattr(self.algorithm, 'greeks_cache'):
-                            self.algorithm.greeks_cache = {}
-                        self.algorithm.greeks_cache[symbol] = ((delta, gamma, theta, vega), self.algorithm.Time)
+                        options_data.cache_greeks(symbol, (delta, gamma, theta, vega), algo.Time)
                     except Exception:
                         pass
                 
                 # 2) Fallback to Securities data if OnData Greeks not available
-                if delta is None and symbol in self.algorithm.Securities:
-                    security = self.algorithm.Securities[symbol]
+                if delta is None and symbol in securities:
+                    security = securities[symbol]
                     if hasattr(security, 'Greeks') and security.Greeks is not None and security.Greeks.Delta is not None:
                         delta = float(security.Greeks.Delta)
                         delta_source = "QC-SECURITIES"
@@ -275,8 +301,8 @@ class PositionManager:
                 # 3) Fallback to centralized options_data manager
                 if delta is None:
                     try:
-                        if hasattr(self.algorithm, 'options_data') and self.algorithm.options_data is not None:
-                            d, src = self.algorithm.options_data.get_delta(symbol)
+                        if options_data is not None:
+                            d, src = options_data.get_delta(symbol)
                             delta = float(d) if d is not None else None
                             delta_source = src
                     except Exception:
@@ -284,11 +310,11 @@ class PositionManager:
                         delta_source = None
 
                 # 4) Final fallback: use greeks_provider if delta is still None
-                if delta is None and hasattr(self.algorithm, 'greeks_provider'):
+                if delta is None and greeks_provider is not None:
                     try:
                         strike = contract.Strike
                         expiration = contract.Expiry
-                        d, src = self.algorithm.greeks_provider.get_delta(symbol, strike, underlying_price, expiration)
+                        d, src = greeks_provider.get_delta(symbol, strike, underlying_price, expiration)
                         delta = float(d) if d is not None else 0.0
                         delta_source = src
                     except Exception:
@@ -297,18 +323,16 @@ class PositionManager:
                 
                 # Track missing Greeks for debugging
                 if delta is None or delta == 0.0:
-                    if not hasattr(self.algorithm, '_missing_greeks_count'):
-                        self.algorithm._missing_greeks_count = 0
-                    self.algorithm._missing_greeks_count += 1
+                    algo._missing_greeks_count += 1
                     # Log first few instances to avoid spam
-                    if self.algorithm.debug_mode and self.algorithm._missing_greeks_count <= 3:
-                        self.algorithm.Debug(f"Missing/zero delta for {symbol} (source: {delta_source})")
+                    if debug and algo._missing_greeks_count <= 3:
+                        algo.Debug(f"Missing/zero delta for {symbol} (source: {delta_source})")
                         # Show what data sources were checked
                         has_chain_greeks = hasattr(contract, 'Greeks') and contract.Greeks is not None
-                        has_sec_greeks = (symbol in self.algorithm.Securities and 
-                                         hasattr(self.algorithm.Securities[symbol], 'Greeks') and 
-                                         self.algorithm.Securities[symbol].Greeks is not None)
-                        self.algorithm.Debug(f"  Chain Greeks: {has_chain_greeks}, Securities Greeks: {has_sec_greeks}")
+                        has_sec_greeks = (symbol in securities and 
+                                          hasattr(securities[symbol], 'Greeks') and 
+                                          securities[symbol].Greeks is not None)
+                        algo.Debug(f"  Chain Greeks: {has_chain_greeks}, Securities Greeks: {has_sec_greeks}")
 
                 # DELTA BAND FILTER: Keep only options within 18-25 delta range (for short puts, delta is negative)
                 # This ensures we stay in the optimal theta/risk band and avoid drifting too close to ATM
@@ -358,18 +382,18 @@ class PositionManager:
                     })
 
             # Enhanced filtering results with data source info
-            if self.algorithm.debug_mode:
-                self.algorithm.Debug(f"Option filtering (OnData chain): {total_contracts} total, {puts_found} puts")
-                self.algorithm.Debug(f"  Filtered OUT: Delta={delta_filtered}, DTE={dte_filtered}, "
-                                   f"Premium={premium_filtered}, Spread={spread_filtered}")
-                self.algorithm.Debug(f"  PASSED all filters: {len(candidates)} candidates")
+            if debug:
+                algo.Debug(f"Option filtering (OnData chain): {total_contracts} total, {puts_found} puts")
+                algo.Debug(f"  Filtered OUT: Delta={delta_filtered}, DTE={dte_filtered}, "
+                           f"Premium={premium_filtered}, Spread={spread_filtered}")
+                algo.Debug(f"  PASSED all filters: {len(candidates)} candidates")
                 if len(candidates) == 0:
-                    self.algorithm.Debug(f"  NO CANDIDATES: Price=${underlying_price:.2f}, "
-                                               f"Delta={MIN_DELTA:.2f}-{MAX_DELTA:.2f}, "
-                                               f"DTE={self.algorithm.min_target_dte}-{self.algorithm.max_target_dte}")
+                    algo.Debug(f"  NO CANDIDATES: Price=${underlying_price:.2f}, "
+                               f"Delta={MIN_DELTA:.2f}-{MAX_DELTA:.2f}, "
+                               f"DTE={algo.min_target_dte}-{algo.max_target_dte}")
 
         except Exception as e:
-            self.algorithm.Debug(f"Error finding tradable options: {e}")
+            algo.Debug(f"Error finding tradable options: {e}")
 
         return candidates
 
@@ -438,7 +462,7 @@ class PositionManager:
             # Store position data
             # IMPORTANT: Initialize quantity at 0 to avoid double-counting when the fill event arrives.
             # Save intended size in target_contracts for Phase 1 hedging.
-            self.algorithm.positions[position_id] = {
+            self.algorithm.add_position(position_id, {
                 'symbol': symbol,
                 'contract': contract,
                 'quantity': 0,  # Will be updated by OnOrderEvent fill
@@ -450,7 +474,7 @@ class PositionManager:
                 'delta': option_data.get('delta'),
                 'dte': option_data.get('dte'),
                 'estimated_margin': estimated_margin  # Store calculated margin
-            }
+            })
 
             # Place limit order at mid price (control fills in backtests)
             try:
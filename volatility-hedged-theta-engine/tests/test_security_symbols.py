@@ -0,0 +1,47 @@
+"""
+Securities key mirror (security_symbols) must agree with `symbol in Securities`.
+Runs inside a LEAN environment (AlgorithmImports available); skipped elsewhere.
+"""
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("AlgorithmImports")
+
+from main import DeltaHedgedThetaEngine
+
+
+def _algo(symbols):
+    cleared = []
+    algo = SimpleNamespace(
+        Securities=SimpleNamespace(Keys=list(symbols)),
+        _sec_symbol_set=None,
+        delta_hedger=SimpleNamespace(clear_symbol_cache=cleared.append),
+    )
+    return algo, cleared
+
+
+def test_held_option_removed_from_universe_stays_in_mirror():
+    underlying, option = "SPY", "SPY 250117P00450000"
+    algo, cleared = _algo([underlying, option])
+    assert option in DeltaHedgedThetaEngine.security_symbols(algo)
+
+    # LEAN keeps a removed (still held) security in Securities; the mirror must too
+    changes = SimpleNamespace(AddedSecurities=[], RemovedSecurities=[SimpleNamespace(Symbol=option)])
+    DeltaHedgedThetaEngine.OnSecuritiesChanged(algo, changes)
+
+    symbols = DeltaHedgedThetaEngine.security_symbols(algo)
+    assert option in symbols
+    assert underlying in symbols
+    assert cleared == [option]
+
+
+def test_added_security_enters_mirror():
+    algo, _cleared = _algo(["SPY"])
+    DeltaHedgedThetaEngine.security_symbols(algo)
+
+    added = "SPY 250117P00440000"
+    changes = SimpleNamespace(AddedSecurities=[SimpleNamespace(Symbol=added)], RemovedSecurities=[])
+    DeltaHedgedThetaEngine.OnSecuritiesChanged(algo, changes)
+
+    assert added in DeltaHedgedThetaEngine.security_symbols(algo)